@@ -0,0 +1,368 @@
+"""Benchmark `comp_freq` across engines, row counts, key cardinalities, skews and dimensions.
+
+Every case runs in a fresh process, so its peak RSS is its own. Run a grid of cases into a
+JSON file, then compare two files, i.e. of two releases:
+
+    python -m benchmarks.bench run --rows 1e4,1e6 --engines polars,duckdb --out new.json
+    python -m benchmarks.bench compare old.json new.json --tolerance 0.1
+
+Postgres cases start a container through the testcontainers fixture of the test suite,
+they are skipped where Docker is not available.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib
+import importlib.util
+import itertools
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pa_csv
+from rich.console import Console
+from rich.table import Table
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+    from drift_scope.base import BaseComparator
+
+ENGINES = ("polars", "pandas", "duckdb", "postgres")
+
+## Rows generated per chunk, bounding the memory of generating 1e8 rows:
+_CHUNK_ROWS = 10_000_000
+
+## Share of the values of the second dataset shifted past those of the first, so keys
+## both drift in frequency and vanish or appear:
+_SHIFT = 0.1
+
+
+@dataclass(frozen=True)
+class Case:
+    """One benchmark, comparing two generated datasets in one engine."""
+
+    engine: str
+    rows: int
+    cardinality: int
+    skew: float
+    dims: int
+
+    @property
+    def vars(self) -> tuple[str, ...]:
+        """The dimension columns compared."""
+        return tuple(f"d{i}" for i in range(self.dims))
+
+
+@dataclass
+class Measurement:
+    """Timings and memory of a case, or why it was skipped."""
+
+    case: Case
+    seconds: list[float] = field(default_factory=list)
+    rss_before_mb: float | None = None
+    peak_rss_mb: float | None = None
+    keys: int | None = None
+    skipped: str | None = None
+
+    @property
+    def best_seconds(self) -> float | None:
+        """The fastest repetition, the least disturbed by the rest of the machine."""
+        return min(self.seconds, default=None)
+
+    @property
+    def rows_per_sec(self) -> float | None:
+        """Rows of both datasets compared per second, in the fastest repetition."""
+        best = self.best_seconds
+        return 2 * self.case.rows / best if best else None
+
+    def to_json(self) -> dict[str, Any]:
+        """The case and its measurements as one flat record."""
+        return {
+            **asdict(self.case),
+            "seconds": self.seconds,
+            "best_seconds": self.best_seconds,
+            "rows_per_sec": self.rows_per_sec,
+            "rss_before_mb": self.rss_before_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+            "keys": self.keys,
+            "skipped": self.skipped,
+        }
+
+
+def zipf_codes(rows: int, cardinality: int, skew: float, seed: int) -> pa.Array[Any]:
+    """Draw `rows` codes in `[0, cardinality)`, code `k` with probability ∝ `1 / (k + 1) ** skew`.
+
+    A `skew` of 0 draws uniformly. Codes are drawn by inverting the cumulative
+    distribution of uniform draws, so generation is linear in `rows`.
+    """
+    weights = pl.int_range(1, cardinality + 1, eager=True).cast(pl.Float64).pow(-skew)
+    cdf = weights.cum_sum() / weights.sum()
+    uniform = pl.Series(pc.random(rows, initializer=seed))
+    codes = cdf.search_sorted(uniform, side="right").clip(upper_bound=cardinality - 1)
+    return codes.cast(pl.Int32).to_arrow()
+
+
+def generate(rows: int, cardinality: int, skew: float, dims: int, seed: int) -> pa.Table:
+    """A dataset of `dims` string dimension columns, each of `cardinality` Zipfian values.
+
+    Values of every column are drawn independently, in chunks of `_CHUNK_ROWS` rows, and
+    taken from a dictionary, so strings are built once per distinct value.
+    """
+    dictionary = pa.array([f"v{i}" for i in range(int(cardinality * (1 + _SHIFT)))])
+    columns: dict[str, list[pa.Array[Any]]] = {f"d{i}": [] for i in range(dims)}
+    for start in range(0, rows, _CHUNK_ROWS):
+        size = min(_CHUNK_ROWS, rows - start)
+        for i, chunks in enumerate(columns.values()):
+            codes = zipf_codes(size, cardinality, skew, seed=hash((seed, i, start)) % 2**31)
+            if seed % 2:
+                codes = pc.add(codes, pa.scalar(int(cardinality * _SHIFT), pa.int32()))
+            chunks.append(pc.take(dictionary, codes))  # type: ignore[call-overload]
+    return pa.table({col: pa.chunked_array(chunks, pa.string()) for col, chunks in columns.items()})
+
+
+@contextlib.contextmanager
+def _frames(backend: str, table1: pa.Table, table2: pa.Table) -> Iterator[BaseComparator]:
+    from drift_scope import DataFrameComparator
+
+    if backend == "polars":
+        frames = (pl.DataFrame(pl.from_arrow(table)) for table in (table1, table2))
+    else:
+        frames = (table.to_pandas() for table in (table1, table2))
+    yield DataFrameComparator(*frames)
+
+
+@contextlib.contextmanager
+def _duckdb(table1: pa.Table, table2: pa.Table) -> Iterator[BaseComparator]:
+    import duckdb
+
+    from drift_scope import SQLComparator
+
+    with duckdb.connect() as con:
+        for name, table in (("df1", table1), ("df2", table2)):
+            con.from_arrow(table).create(name)
+        yield SQLComparator("df1", "df2", con=con, con_type="DUCKDB")
+
+
+@contextlib.contextmanager
+def _postgres(table1: pa.Table, table2: pa.Table) -> Iterator[BaseComparator]:
+    from drift_scope import SQLComparator
+    from tests.test_cases import _get_postgres
+
+    with _get_postgres() as con, tempfile.TemporaryDirectory() as tmp:
+        for name, table in (("df1", table1), ("df2", table2)):
+            cols = ", ".join(f"{col} VARCHAR" for col in table.column_names)
+            con.execute(f"CREATE TABLE {name} ({cols})")
+            path = Path(tmp) / f"{name}.csv"
+            pa_csv.write_csv(table, path, pa_csv.WriteOptions(include_header=False))
+            with path.open() as file:
+                con.copy_expert(f"COPY {name} FROM STDIN WITH (FORMAT CSV)", file)
+            con.execute(f"ANALYZE {name}")
+        yield SQLComparator("df1", "df2", con=con, con_type="PSYCOPG2")
+
+
+def _comparator(
+    engine: str,
+) -> Callable[[pa.Table, pa.Table], contextlib.AbstractContextManager[BaseComparator]]:
+    if engine in ("polars", "pandas"):
+        return lambda table1, table2: _frames(engine, table1, table2)
+    return _duckdb if engine == "duckdb" else _postgres
+
+
+def _skip_reason(engine: str) -> str | None:
+    """Why `engine` cannot run here, if it cannot."""
+    modules = {"pandas": "pandas", "duckdb": "duckdb", "postgres": "testcontainers"}
+    if engine in modules and importlib.util.find_spec(modules[engine]) is None:
+        return f"{modules[engine]} is not installed"
+    if engine == "postgres":
+        try:
+            import docker
+
+            docker.from_env().ping()
+        except Exception as e:
+            return f"Docker is not available: {type(e).__name__}"
+    return None
+
+
+def _max_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    ## Linux reports kilobytes, macOS bytes:
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+
+
+def run_case(case: Case, repeat: int, seed: int) -> Measurement:
+    """Generate both datasets, then time `comp_freq` on them `repeat` times.
+
+    Meant to run in its own process: the peak RSS before the comparisons covers the
+    generated data, the peak RSS after also the comparisons. Postgres compares in the
+    server, whose memory is not measured.
+    """
+    measurement = Measurement(case)
+    if reason := _skip_reason(case.engine):
+        measurement.skipped = reason
+        return measurement
+
+    table1, table2 = (
+        generate(case.rows, case.cardinality, case.skew, case.dims, seed=seed + i) for i in range(2)
+    )
+    with _comparator(case.engine)(table1, table2) as comp:
+        measurement.rss_before_mb = _max_rss_mb()
+        for _ in range(repeat):
+            comp.results.clear()
+            comp.freq_cache.clear()
+            start = time.perf_counter()
+            comp.comp_freq(case.vars)
+            comp.collect()
+            measurement.seconds.append(time.perf_counter() - start)
+        measurement.peak_rss_mb = _max_rss_mb()
+        measurement.keys = len(comp.results[0].data)
+    return measurement
+
+
+def run(cases: Sequence[Case], repeat: int, seed: int) -> Iterator[Measurement]:
+    """Run every case in a fresh process, one at a time, so cases do not share memory."""
+    for case in cases:
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            yield pool.submit(run_case, case, repeat, seed).result()
+
+
+def _environment() -> dict[str, Any]:
+    """What a run depends on, to tell runs on different machines or versions apart."""
+    versions = {}
+    for module in ("drift_scope", "narwhals", "pyarrow", "polars", "pandas", "duckdb"):
+        with contextlib.suppress(ImportError):
+            versions[module] = getattr(importlib.import_module(module), "__version__", None)
+    commit = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        capture_output=True,
+        text=True,
+        check=False,
+    ).stdout.strip()
+    return {
+        "timestamp": datetime.now(UTC).isoformat(),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "versions": versions,
+    }
+
+
+def _key(record: dict[str, Any]) -> tuple[Any, ...]:
+    return tuple(record[name] for name in ("engine", "rows", "cardinality", "skew", "dims"))
+
+
+def compare(baseline: dict[str, Any], candidate: dict[str, Any], tolerance: float) -> bool:
+    """Print the speedup of every case measured in both runs, true if none regressed.
+
+    A case regresses when its best time is more than `tolerance` slower than the baseline.
+    """
+    before = {_key(record): record for record in baseline["cases"] if record["best_seconds"]}
+    table = Table(
+        title=f"{baseline['environment']['commit']} → {candidate['environment']['commit']}",
+        title_justify="left",
+    )
+    for header in ("Engine", "Rows", "Cardinality", "Skew", "Dims", "Before", "After", "Speedup"):
+        table.add_column(header=header, no_wrap=True, justify="right")
+
+    regressed = False
+    for record in candidate["cases"]:
+        old = before.get(_key(record))
+        if old is None or not record["best_seconds"]:
+            continue
+        speedup = old["best_seconds"] / record["best_seconds"]
+        if speedup < 1 / (1 + tolerance):
+            style, regressed = "red", True
+        elif speedup > 1 + tolerance:
+            style = "green"
+        else:
+            style = ""
+        table.add_row(
+            *(str(value) for value in _key(record)),
+            f"{old['best_seconds']:.3f}s",
+            f"{record['best_seconds']:.3f}s",
+            f"{speedup:.2f}x",
+            style=style,
+        )
+    Console().print(table)
+    return not regressed
+
+
+def _numbers(text: str) -> list[float]:
+    return [float(value) for value in text.split(",")]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Command line entry point, returns the exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run a grid of cases into a JSON file")
+    run_parser.add_argument("--engines", default="polars,pandas,duckdb,postgres")
+    run_parser.add_argument("--rows", type=_numbers, default=[1e4, 1e5, 1e6])
+    run_parser.add_argument(
+        "--cardinality", type=_numbers, default=[1e2, 1e4], help="values per dimension"
+    )
+    run_parser.add_argument("--skew", type=_numbers, default=[0, 1.2], help="Zipf exponent")
+    run_parser.add_argument("--dims", type=_numbers, default=[1, 3])
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--out", type=Path, default=Path("bench.json"))
+
+    compare_parser = commands.add_parser("compare", help="compare two JSON files of runs")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("candidate", type=Path)
+    compare_parser.add_argument("--tolerance", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    if args.command == "compare":
+        baseline, candidate = (
+            json.loads(path.read_text()) for path in (args.baseline, args.candidate)
+        )
+        return 0 if compare(baseline, candidate, args.tolerance) else 1
+
+    engines = args.engines.split(",")
+    if unknown := set(engines) - set(ENGINES):
+        parser.error(f"unknown engines {sorted(unknown)}, choose from {ENGINES}")
+    cases = [
+        Case(engine, int(rows), int(cardinality), skew, int(dims))
+        for rows, cardinality, skew, dims, engine in itertools.product(
+            args.rows, args.cardinality, args.skew, args.dims, engines
+        )
+    ]
+
+    console = Console()
+    records = []
+    for measurement in run(cases, args.repeat, args.seed):
+        records.append(measurement.to_json())
+        case = measurement.case
+        if measurement.skipped:
+            console.print(f"{case} skipped, {measurement.skipped}", style="yellow")
+        else:
+            console.print(
+                f"{case}: {measurement.best_seconds:.3f}s, "
+                f"{measurement.rows_per_sec:,.0f} rows/s, {measurement.peak_rss_mb:.0f} MB"
+            )
+        ## Rewritten after every case, so an interrupted run keeps what it measured:
+        args.out.write_text(json.dumps({"environment": _environment(), "cases": records}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,56 @@
-from drift_scope.dataframe import DataFrameComparator
-from drift_scope.sql import SQLComparator
+from __future__ import annotations
 
-__all__ = [SQLComparator, DataFrameComparator]
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from drift_scope.arrow import ArrowComparator
+    from drift_scope.dataframe import DataFrameComparator
+    from drift_scope.profiles import ProfileStore
+    from drift_scope.resultset import ResultSet
+    from drift_scope.scheduler import SQLScheduler
+    from drift_scope.snapshots import DataFrameSnapshotComparator, SQLSnapshotComparator
+    from drift_scope.sql import SQLComparator
+    from drift_scope.tracing import Span, Tracer
+
+## Exports are imported on first access, so importing the package loads no dependency and
+## each comparator only the dependencies of its own code path:
+_EXPORTS = {
+    "SQLComparator": "drift_scope.sql",
+    "DataFrameComparator": "drift_scope.dataframe",
+    "ArrowComparator": "drift_scope.arrow",
+    "ProfileStore": "drift_scope.profiles",
+    "SQLScheduler": "drift_scope.scheduler",
+    "SQLSnapshotComparator": "drift_scope.snapshots",
+    "DataFrameSnapshotComparator": "drift_scope.snapshots",
+    "ResultSet": "drift_scope.resultset",
+    "Tracer": "drift_scope.tracing",
+    "Span": "drift_scope.tracing",
+}
+
+__all__ = [
+    "SQLComparator",
+    "DataFrameComparator",
+    "ArrowComparator",
+    "ProfileStore",
+    "SQLScheduler",
+    "SQLSnapshotComparator",
+    "DataFrameSnapshotComparator",
+    "ResultSet",
+    "Tracer",
+    "Span",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    ## Cached as a module attribute, later accesses skip `__getattr__`:
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+import narwhals as nw
+
+from drift_scope._utils import with_freq_diffs
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection
+
+
+class FreqCache:
+    """Least recently used cache of frequency comparisons, keyed by dimension set.
+
+    A comparison over `("city", "state")` holds the exact `n1` and `n2` of every key, so any
+    coarser dimension set, i.e. `("state",)`, is answered by re-summing it. Entries are
+    bounded by their estimated size in bytes, evicting the least recently used first.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[frozenset[str], tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated size of all cached comparisons."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, vars: Collection[str]) -> bool:
+        return frozenset(vars) in self._entries
+
+    def clear(self) -> None:
+        """Drop every cached comparison."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def put(self, vars: Collection[str], data: Any) -> None:
+        """Cache the comparison `data` of `vars`, evicting older entries to make room.
+
+        Lazy frames are not cached, since their size is unknown until collected.
+        """
+        frame = nw.from_native(data)
+        if not isinstance(frame, nw.DataFrame):
+            return
+
+        key = frozenset(vars)
+        size = int(frame.estimated_size("b"))
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        while self._entries and self._bytes + size > self.max_bytes:
+            self._bytes -= self._entries.popitem(last=False)[1][1]
+
+        self._entries[key] = (data, size)
+        self._bytes += size
+
+    def rollup(
+        self,
+        vars: Collection[str],
+        analysis_cols: Collection[str],
+        *,
+        count_cols: Collection[str] = ("n1", "n2"),
+        with_diffs: Callable[[Any], Any] = with_freq_diffs,
+    ) -> Any | None:
+        """Derive the comparison of `vars` from the smallest cached superset, if any.
+
+        `count_cols` are re-summed and `with_diffs` derives the other analysis columns from
+        them, which default to those of pairwise comparisons. The result is of the same type
+        as the cached data, with the cached dtypes.
+        """
+        key = frozenset(vars)
+        supersets = [cached for cached in self._entries if key <= cached]
+        if not supersets:
+            return None
+
+        finest = min(supersets, key=lambda cached: self._entries[cached][1])
+        self._entries.move_to_end(finest)
+        data = self._entries[finest][0]
+        frame: nw.DataFrame[Any] = nw.from_native(data, eager_only=True)
+
+        rolled_up: nw.DataFrame[Any] | nw.LazyFrame[Any]
+        if finest == key:
+            rolled_up = frame.select(*vars, *analysis_cols)
+        else:
+            schema = frame.schema
+            counts = frame.group_by(*vars).agg(nw.col(*count_cols).sum())
+            rolled_up = with_diffs(counts).select(
+                *vars, *(nw.col(col).cast(schema[col]) for col in analysis_cols)
+            )
+
+        if isinstance(data, nw.DataFrame):
+            return rolled_up
+        return rolled_up.to_native()
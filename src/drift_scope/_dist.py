@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import math
+from itertools import accumulate
+from typing import TYPE_CHECKING
+
+import narwhals as nw
+import pyarrow as pa
+
+from drift_scope.results import DistResults
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Any
+
+## Empty bins are floored to this share, so PSI stays finite:
+_PSI_FLOOR = 1e-4
+
+
+def quantile_probs(bins: int) -> list[float]:
+    """Probabilities of the interior edges of `bins` equally populated bins."""
+    if bins < 2:
+        msg = f"`bins` must be at least 2, not {bins!r}."
+        raise ValueError(msg)
+    return [i / bins for i in range(1, bins)]
+
+
+def bin_edges(quantiles: Sequence[float | None]) -> list[float]:
+    """Distinct sorted edges from quantiles, which repeat on ties and are None without values."""
+    return sorted({float(q) for q in quantiles if q is not None})
+
+
+def compare_bins(var: str, edges: Sequence[float], counts: Any) -> DistResults:
+    """Compare the binned distributions of `var` in both datasets.
+
+    `counts` holds the `n1` and `n2` rows, and the `min_value` and `max_value`, of every
+    non-empty `bin`, where bin `i` holds the values in `[edges[i - 1], edges[i])`.
+    """
+    rows = {
+        row["bin"]: row for row in nw.from_native(counts, eager_only=True).iter_rows(named=True)
+    }
+    bins = range(len(edges) + 1)
+    n1 = [rows[i]["n1"] if i in rows else 0 for i in bins]
+    n2 = [rows[i]["n2"] if i in rows else 0 for i in bins]
+    p1 = [n / (sum(n1) or 1) for n in n1]
+    p2 = [n / (sum(n2) or 1) for n in n2]
+
+    psi = sum(
+        (b - a) * math.log(b / a)
+        for a, b in zip(
+            (max(p, _PSI_FLOOR) for p in p1), (max(p, _PSI_FLOOR) for p in p2), strict=True
+        )
+    )
+
+    ## CDF gaps at every boundary, from the smallest to the largest value observed:
+    gaps = [abs(a - b) for a, b in zip(accumulate(p1), accumulate(p2), strict=True)][:-1]
+    ks = max(gaps, default=0.0)
+    low = min([row["min_value"] for row in rows.values()] + list(edges[:1]), default=0.0)
+    high = max([row["max_value"] for row in rows.values()] + list(edges[-1:]), default=0.0)
+    boundaries = [low, *edges, high]
+    ## Linear CDFs within bins, so the gap is integrated with the trapezoidal rule:
+    gap_at = [0.0, *gaps, 0.0]
+    wasserstein = sum(
+        (gap_at[i] + gap_at[i + 1]) / 2 * (boundaries[i + 1] - boundaries[i])
+        for i in range(len(boundaries) - 1)
+    )
+
+    data = pa.table(
+        {
+            "bin": list(bins),
+            "lower": [-math.inf, *edges],
+            "upper": [*edges, math.inf],
+            "n1": n1,
+            "n2": n2,
+            "p1": p1,
+            "p2": p2,
+        }
+    )
+    return DistResults(var=var, data=data, psi=psi, ks=ks, wasserstein=wasserstein)
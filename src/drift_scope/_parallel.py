@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import importlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from multiprocessing import get_all_start_methods, get_context
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import narwhals as nw
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from drift_scope._sketch import ArrowArray, stable_hashes
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+    from multiprocessing.context import BaseContext
+    from typing import Any
+
+## Partitions are shipped through files in RAM backed shared memory, where available:
+_SHARED_MEMORY = Path("/dev/shm")
+
+## Rows of each chunk sampled to decide whether counting it before routing pays off:
+_PREAGGREGATE_SAMPLE_ROWS = 100_000
+
+## Chunks are counted before routing if the sample has at most this many keys per row:
+_PREAGGREGATE_MAX_RATIO = 0.5
+
+
+def _write(table: pa.Table, path: Path) -> None:
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read(path: Path) -> pa.Table:
+    """Read an arrow IPC file memory mapped, so its buffers are shared, not copied."""
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def _pool_context(backend: str, *, preload: bool) -> BaseContext:
+    """Spawn workers, or with `preload`, fork them from a server that imported their modules.
+
+    The server outlives the pool, so later pools start in milliseconds instead of
+    importing everything again, as spawned workers do. The forkserver and its preloaded
+    modules are shared by the whole process though, every later forkserver pool of the
+    application preloads them too, so preloading is opted into by the caller.
+    """
+    if not preload or "forkserver" not in get_all_start_methods():
+        return get_context("spawn")
+    context = get_context("forkserver")
+    ## Only takes effect if the server of this process is not running yet:
+    context.set_forkserver_preload([__name__, backend])
+    return context
+
+
+def _from_arrow(table: pa.Table, backend: str) -> nw.DataFrame[Any]:
+    return nw.from_arrow(table, native_namespace=importlib.import_module(backend))
+
+
+def _count_chunk(
+    paths: tuple[Path, Path],
+    chunk: int,
+    partitions: int,
+    vars: Collection[str],
+    backend: str,
+    strategy: str,
+    out: Path,
+) -> list[int]:
+    """Count one of `partitions` row chunks of both dataframes, sorted by key partition.
+
+    Chunks whose keys barely repeat are not counted, every row is routed as a count of 1
+    instead, and counted once by its partition. Returns the offset of every partition in
+    the written counts, and their end.
+    """
+    from drift_scope.dataframe import DataFrameComparator
+
+    tables = []
+    for path in paths:
+        table = _read(path)
+        start, stop = (table.num_rows * i // partitions for i in (chunk, chunk + 1))
+        tables.append(table.slice(start, stop - start))
+
+    if _repeats(tables, vars):
+        frame1, frame2 = (_from_arrow(table, backend) for table in tables)
+        comp = DataFrameComparator(frame1, frame2, strategy=strategy)  # type: ignore[arg-type]
+        partial = nw.from_native(comp._count_freq(vars), eager_only=True).to_arrow()
+    else:
+        partial = pa.concat_tables(
+            [
+                table.append_column("n1", _repeat(int(i == 0), table.num_rows)).append_column(
+                    "n2", _repeat(int(i == 1), table.num_rows)
+                )
+                for i, table in enumerate(tables)
+            ]
+        )
+
+    ## Every partial of a partition is concatenated, so all are written in one schema:
+    keys = tables[0].select(list(vars)).schema
+    counts = pa.schema([pa.field("n1", pa.int64()), pa.field("n2", pa.int64())])
+    partial = partial.select([*vars, "n1", "n2"]).cast(pa.unify_schemas([keys, counts]))
+
+    hashes = stable_hashes(partial.select(list(vars)))
+    modulus = pa.scalar(partitions, pa.uint64())
+    partition: ArrowArray = pc.subtract(hashes, pc.multiply(pc.divide(hashes, modulus), modulus))
+    _write(partial.take(pc.sort_indices(partition, [("", "ascending")])), out)
+
+    sizes = pc.value_counts(partition)
+    size = dict(
+        zip(sizes.field("values").to_pylist(), sizes.field("counts").to_pylist(), strict=True)
+    )
+    return list(accumulate((size.get(i, 0) for i in range(partitions)), initial=0))
+
+
+def _repeats(tables: list[pa.Table], vars: Collection[str]) -> bool:
+    """Whether counting would shrink the rows by `_PREAGGREGATE_MAX_RATIO`, per a sample."""
+    sample = pa.concat_tables(
+        [table.slice(0, _PREAGGREGATE_SAMPLE_ROWS // len(tables)) for table in tables]
+    )
+    if not sample.num_rows:
+        return True
+    keys = sample.group_by(list(vars), use_threads=False).aggregate([])
+    return keys.num_rows <= _PREAGGREGATE_MAX_RATIO * sample.num_rows
+
+
+def _repeat(value: int, size: int) -> ArrowArray:
+    return pa.repeat(pa.scalar(value, pa.int64()), size)  # type: ignore[call-overload]
+
+
+def _merge_partition(
+    chunks: list[tuple[Path, list[int]]],
+    partition: int,
+    vars: Collection[str],
+    backend: str,
+    strategy: str,
+    out: Path,
+) -> None:
+    """Sum the counts of one partition over every chunk, which hold all of its keys.
+
+    With the join strategy, each dataframe is summed on its own and both are joined, so
+    null keys match across dataframes only if joins of the backend match them, as when
+    counting in process.
+    """
+    partials = _from_arrow(
+        pa.concat_tables(
+            [
+                _read(path).slice(offsets[partition], offsets[partition + 1] - offsets[partition])
+                for path, offsets in chunks
+            ]
+        ),
+        backend,
+    )
+    if strategy == "join":
+        from drift_scope.dataframe import join_counts
+
+        agg1, agg2 = (
+            partials.filter(nw.col(count) > 0).group_by(*vars).agg(nw.col(count).sum())
+            for count in ("n1", "n2")
+        )
+        merged = join_counts(vars, agg1, agg2)
+    else:
+        merged = partials.group_by(*vars).agg(nw.col("n1", "n2").sum())
+    merged = merged.with_columns(nw.col("n1", "n2").cast(nw.Int64))
+    ## Selected from arrow, since pandas exports its index of the joined rows too:
+    _write(merged.to_arrow().select([*vars, "n1", "n2"]), out)
+
+
+def count_freq_partitioned(
+    df1: nw.DataFrame[Any],
+    df2: nw.DataFrame[Any],
+    vars: Collection[str],
+    strategy: str,
+    max_workers: int,
+    *,
+    preload: bool = False,
+) -> nw.DataFrame[Any]:
+    """Count both dataframes by `vars` into `n1` and `n2` on a pool of `max_workers` processes.
+
+    The keys of both dataframes are written once as arrow files to shared memory, which
+    every worker maps without copying or pickling. Each worker first counts a chunk of
+    rows, routing its partial counts to hash partitions of the keys, then sums one
+    partition over all chunks. Every key falls into exactly one partition, so the merged
+    partitions are concatenated as they are. Workers count with the backend of `df1`.
+    Workers are spawned, or forked from the preloaded forkserver of the process with
+    `preload`, see `_pool_context`.
+    """
+    backend = nw.get_native_namespace(df1).__name__
+    table1 = df1.select(*vars).to_arrow()
+    table2 = df2.select(*vars).to_arrow().cast(table1.schema)
+
+    shared = _SHARED_MEMORY if _SHARED_MEMORY.is_dir() else None
+    with (
+        tempfile.TemporaryDirectory(dir=shared, prefix="drift_scope_") as tmp,
+        ProcessPoolExecutor(
+            max_workers, mp_context=_pool_context(backend, preload=preload)
+        ) as pool,
+    ):
+        paths = (Path(tmp) / "df1.arrow", Path(tmp) / "df2.arrow")
+        for table, path in zip((table1, table2), paths, strict=True):
+            _write(table, path)
+
+        outs = [Path(tmp) / f"chunk_{i}.arrow" for i in range(max_workers)]
+        offsets = [
+            pool.submit(_count_chunk, paths, i, max_workers, vars, backend, strategy, out)
+            for i, out in enumerate(outs)
+        ]
+        chunks = [(out, future.result()) for out, future in zip(outs, offsets, strict=True)]
+
+        merged = [Path(tmp) / f"partition_{i}.arrow" for i in range(max_workers)]
+        for future in [
+            pool.submit(_merge_partition, chunks, i, vars, backend, strategy, out)
+            for i, out in enumerate(merged)
+        ]:
+            future.result()
+
+        ## Read the partitions into memory before their files are removed:
+        counts = pa.concat_tables([_read(path).combine_chunks() for path in merged])
+    return _from_arrow(counts, backend)
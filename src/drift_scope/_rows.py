@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import datetime as dt
+import decimal
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Any
+
+    import pyarrow as pa
+
+type Key = tuple[Any, ...]
+
+## Half open range of keys `[lo, hi)`, None is unbounded:
+type KeyRange = tuple[Key | None, Key | None]
+
+CHANGES = ("inserted", "deleted", "updated")
+
+
+def sql_literal(value: Any) -> str:
+    """Render a key value as a SQL literal, strings and temporal values quoted."""
+    if value is None:
+        msg = "Keys must not be null to be bisected."
+        raise ValueError(msg)
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int | float | decimal.Decimal):
+        return str(value)
+    if isinstance(value, dt.date | dt.time):
+        return f"'{value.isoformat()}'"
+    text = str(value).replace("'", "''")
+    return f"'{text}'"
+
+
+def key_bound(keys: Sequence[str], key: Key, op: str) -> str:
+    """Lexicographic comparison `(keys) op (key)` for `op` of `<` or `>=`.
+
+    Spelled out column by column, since engines differ in their support of row values.
+    """
+    literals = [sql_literal(value) for value in key]
+    last = "<" if op == "<" else ">="
+    strict = "<" if op == "<" else ">"
+    terms = []
+    for i in range(len(keys)):
+        equal = [f"{keys[j]} = {literals[j]}" for j in range(i)]
+        cmp = last if i == len(keys) - 1 else strict
+        terms.append(" AND ".join([*equal, f"{keys[i]} {cmp} {literals[i]}"]))
+    return " OR ".join(f"({term})" for term in terms)
+
+
+def key_range(keys: Sequence[str], segment: KeyRange) -> str:
+    """SQL predicate of the keys falling into `segment`."""
+    lo, hi = segment
+    bounds = [f"({key_bound(keys, lo, '>=')})"] if lo is not None else []
+    if hi is not None:
+        bounds.append(f"({key_bound(keys, hi, '<')})")
+    return " AND ".join(bounds) or "TRUE"
+
+
+def segment_search(keys: Sequence[str], segments: Sequence[KeyRange]) -> str:
+    """SQL expression of the position of the range holding the keys, null if none.
+
+    `segments` are disjoint and in key order. The expression bisects them by their lower
+    bounds, nested `CASE` by `CASE`, so every row is compared to about `log2(segments)`
+    bounds instead of trying every range in turn, and the expression holds two bounds
+    per range.
+    """
+    if not segments:
+        return "CAST(NULL AS INTEGER)"
+
+    def search(start: int, stop: int) -> str:
+        """Position among `segments[start:stop]`, of keys at or above the first of them."""
+        if stop - start == 1:
+            hi = segments[start][1]
+            if hi is None:
+                return str(start)
+            return f"CASE WHEN {key_bound(keys, hi, '<')} THEN {start} END"
+        mid = (start + stop) // 2
+        lo = segments[mid][0]
+        if lo is None:
+            msg = "Only the first of the key ranges can be unbounded below."
+            raise ValueError(msg)
+        below = key_bound(keys, lo, "<")
+        return f"CASE WHEN {below} THEN {search(start, mid)} ELSE {search(mid, stop)} END"
+
+    lo = segments[0][0]
+    if lo is None:
+        return search(0, len(segments))
+    return f"CASE WHEN {key_bound(keys, lo, '>=')} THEN {search(0, len(segments))} END"
+
+
+def split_range(segment: KeyRange, splits: Sequence[Key]) -> list[KeyRange]:
+    """Split `segment` at the `splits` sorted by the engine, into adjacent ranges.
+
+    Splits come from within the segment, in the collation of the engine, so only the lower
+    bound itself and repeated splits would bound empty ranges.
+    """
+    lo, hi = segment
+    inner = [key for key in dict.fromkeys(splits) if key != lo]
+    bounds = [lo, *inner, hi]
+    return list(pairwise(bounds))
+
+
+def diff_rows(
+    schema: pa.Schema,
+    rows1: Sequence[tuple[Key, Any]],
+    rows2: Sequence[tuple[Key, Any]],
+) -> pa.Table:
+    """Classify keyed row hashes of both tables into inserted, deleted and updated keys.
+
+    The result holds the key columns of `schema` and the `change` of every changed key.
+    """
+    import pyarrow as pa
+
+    hashes1, hashes2 = dict(rows1), dict(rows2)
+    changes = [(key, "deleted") for key in hashes1 if key not in hashes2]
+    changes += [
+        (key, "inserted" if key not in hashes1 else "updated")
+        for key, row_hash in hashes2.items()
+        if hashes1.get(key) != row_hash
+    ]
+    columns = [
+        pa.array([change[0][i] for change in changes], field.type) for i, field in enumerate(schema)
+    ]
+    columns.append(pa.array([change[1] for change in changes], pa.string()))
+    return pa.Table.from_arrays(columns, names=[*schema.names, "change"])
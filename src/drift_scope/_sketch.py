@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import math
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from drift_scope.results import SketchResults
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable
+
+HASH_COL = "_hash"
+
+## The pyarrow stubs type compute kernels loosely, so arrays are left untyped:
+type ArrowArray = Any
+
+_MASK64 = (1 << 64) - 1
+
+
+def _u64(value: int) -> pa.Scalar[Any]:
+    return pa.scalar(value & _MASK64, pa.uint64())
+
+
+def mix64(hashes: ArrowArray) -> ArrowArray:
+    """Finalize 64 bit hashes with splitmix64, so every output bit depends on every input bit.
+
+    Engine hashes are not always well mixed, the sketches below rely on uniformly
+    distributed bits.
+    """
+    h = pc.cast(hashes, pa.uint64(), safe=False)
+    h = pc.multiply(pc.bit_wise_xor(h, pc.shift_right(h, _u64(30))), _u64(0xBF58476D1CE4E5B9))
+    h = pc.multiply(pc.bit_wise_xor(h, pc.shift_right(h, _u64(27))), _u64(0x94D049BB133111EB))
+    return pc.bit_wise_xor(h, pc.shift_right(h, _u64(31)))
+
+
+_GOLDEN64 = 0x9E3779B97F4A7C15
+
+
+def stable_hashes(keys: pa.Table | pa.RecordBatch) -> ArrowArray:
+    """Hash the rows of `keys` with arrow kernels, equally in every process.
+
+    The hash is not salted, equal keys hash equally in any process, so it can route keys
+    to partitions processed elsewhere. Floats are hashed by value, so `-0.0` and `0.0`
+    hash equally. Strings are hashed by their length and every 8 byte word, in one pass
+    over the values per word of the longest. Nulls hash to 0.
+    """
+    hashes = _zeros(keys.num_rows, pa.uint64())
+    for values in keys.itercolumns():
+        bits = _value_bits(_combine(values)).fill_null(_u64(0))
+        hashes = pc.bit_wise_xor(pc.multiply(hashes, _u64(_GOLDEN64)), bits)
+    return mix64(hashes)
+
+
+def _value_bits(values: ArrowArray) -> ArrowArray:
+    """Unmixed 64 bits of every value, equal for equal values of one type."""
+    if pa.types.is_dictionary(values.type):
+        values = values.dictionary_decode()
+    if pa.types.is_floating(values.type):
+        normalized: ArrowArray = pc.add(pc.cast(values, pa.float64()), 0.0)
+        return normalized.view(pa.uint64())
+    if pa.types.is_boolean(values.type):
+        return pc.cast(values, pa.uint64())
+    if pa.types.is_temporal(values.type):
+        values = values.view(pa.int64() if values.type.bit_width == 64 else pa.int32())
+    if pa.types.is_integer(values.type):
+        return pc.cast(pc.cast(values, pa.int64()), pa.uint64(), safe=False)
+
+    if not (
+        pa.types.is_string(values.type)
+        or pa.types.is_large_string(values.type)
+        or pa.types.is_binary(values.type)
+        or pa.types.is_large_binary(values.type)
+    ):
+        values = pc.cast(values, pa.large_string())
+    values = pc.cast(values, pa.large_binary())
+    lengths: ArrowArray = pc.binary_length(values)
+    bits: ArrowArray = pc.cast(lengths, pa.uint64())
+    ## Pad every value, so each word starting within it is 8 bytes long:
+    padding = pa.scalar(b"\0" * 8, pa.large_binary())
+    data = pc.binary_join_element_wise(values, padding, pa.scalar(b"", pa.large_binary()))
+    data_lengths = lengths = lengths.fill_null(0)
+    ## Mix in the words of the values still longer than `start`, the rest are final:
+    start = 0
+    while True:
+        longer = pc.greater(data_lengths, start)
+        data, data_lengths = data.filter(longer), data_lengths.filter(longer)
+        if not len(data):
+            return bits
+        word: ArrowArray = pc.binary_slice(data, start, start + 8)
+        word = word.cast(pa.binary(8)).view(pa.uint64())
+        mask: ArrowArray = pc.greater(lengths, start)
+        mixed = pc.bit_wise_xor(pc.multiply(bits.filter(mask), _u64(_GOLDEN64)), word)
+        bits = pc.replace_with_mask(bits, mask, mixed)
+        start += 8
+
+
+def _combine(values: ArrowArray) -> ArrowArray:
+    """Contiguous copy of chunked `values`, so it can be stacked and gathered from cheaply."""
+    return values.combine_chunks() if isinstance(values, pa.ChunkedArray) else values
+
+
+@cache
+def _range(size: int) -> ArrowArray:
+    return pa.array(range(size), pa.uint64())
+
+
+def _zeros(size: int, dtype: pa.DataType) -> ArrowArray:
+    return pa.repeat(pa.scalar(0, dtype), size)  # type: ignore[call-overload]
+
+
+def _dense(index: ArrowArray, values: ArrowArray, size: int, aggregation: str) -> ArrowArray:
+    """Aggregate `values` by `index` into a dense array of `size` slots, 0 where empty."""
+    return (
+        pa.concat_tables(
+            [
+                pa.table({"index": _range(size), "value": _zeros(size, values.type)}),
+                pa.table({"index": pc.cast(index, pa.uint64()), "value": values}),
+            ]
+        )
+        .group_by("index")
+        .aggregate([("value", aggregation)])
+        .sort_by("index")[f"value_{aggregation}"]
+    )
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over 64 bit hashes, of `2 ** precision` registers."""
+
+    def __init__(self, precision: int) -> None:
+        if not 4 <= precision <= 18:
+            msg = f"`precision` must be between 4 and 18, not {precision!r}."
+            raise ValueError(msg)
+        self.precision = precision
+        self.registers: ArrowArray = _zeros(1 << precision, pa.uint64())
+
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the distinct count estimate."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, hashes: ArrowArray) -> None:
+        """Add mixed hashes to the sketch."""
+        index = pc.shift_right(hashes, _u64(64 - self.precision))
+        rest = pc.shift_left(hashes, _u64(self.precision))
+
+        ## Count leading zeros branchlessly, halving the searched width each step:
+        zeros = _zeros(len(hashes), pa.uint64())
+        for width in (32, 16, 8, 4, 2, 1):
+            is_zero = pc.equal(pc.shift_right(rest, _u64(64 - width)), _u64(0))
+            zeros = pc.if_else(is_zero, pc.add(zeros, _u64(width)), zeros)
+            rest = pc.if_else(is_zero, pc.shift_left(rest, _u64(width)), rest)
+        rank = pc.add(pc.min_element_wise(zeros, _u64(64 - self.precision)), _u64(1))
+
+        ranks = _dense(index, rank, len(self.registers), "max")
+        self.registers = _combine(pc.max_element_wise(self.registers, ranks))
+
+    def merge(self, other: HyperLogLog) -> HyperLogLog:
+        """Sketch of the union of both sketches."""
+        union = HyperLogLog(self.precision)
+        union.registers = _combine(pc.max_element_wise(self.registers, other.registers))
+        return union
+
+    def estimate(self) -> float:
+        """Estimated number of distinct hashes added."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        powers: ArrowArray = pc.power(2.0, pc.negate(pc.cast(self.registers, pa.float64())))
+        raw: float = alpha * m * m / pc.sum(powers).as_py()
+        empty = pc.sum(pc.equal(self.registers, _u64(0))).as_py()
+        if raw <= 2.5 * m and empty:
+            return m * math.log(m / empty)  # linear counting for small cardinalities
+        return raw
+
+
+class CountMinSketch:
+    """Count-Min sketch of `depth` rows of `width` counters over 64 bit hashes.
+
+    Estimates never undercount, and overcount by at most `e / width` of the total with
+    probability `1 - e ** -depth`. The rows are laid out back to back in `counters`.
+    """
+
+    def __init__(self, width: int, depth: int) -> None:
+        if width < 2 or width & (width - 1):
+            msg = f"`width` must be a power of two, not {width!r}."
+            raise ValueError(msg)
+        if depth < 1:
+            msg = f"`depth` must be positive, not {depth!r}."
+            raise ValueError(msg)
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.counters: ArrowArray = _zeros(width * depth, pa.int64())
+
+        ## Multiply-shift hashing, one odd multiplier per row:
+        self._shift = _u64(64 - width.bit_length() + 1)
+        seeds = mix64(pa.array(range(1, depth + 1), pa.uint64()))
+        self._multipliers = [_u64(seed | 1) for seed in seeds.to_pylist() if seed is not None]
+
+    @property
+    def epsilon(self) -> float:
+        """Bound on the overcount of each estimate, as a fraction of the total."""
+        return math.e / self.width
+
+    @property
+    def confidence(self) -> float:
+        """Probability that an estimate is within the `epsilon` bound."""
+        return 1 - math.exp(-self.depth)
+
+    def _slots(self, hashes: ArrowArray) -> list[Any]:
+        """Index of the counter of each hash, per row."""
+        return [
+            pc.add(pc.shift_right(pc.multiply(hashes, a), self._shift), _u64(row * self.width))
+            for row, a in enumerate(self._multipliers)
+        ]
+
+    def update(self, hashes: ArrowArray, counts: ArrowArray) -> None:
+        """Add `counts` occurrences of each mixed hash."""
+        self.total += pc.sum(counts).as_py() or 0
+        counts = _combine(counts)
+        slots = pa.chunked_array(self._slots(_combine(hashes)))
+        increments = _dense(
+            slots, pa.chunked_array([counts] * self.depth), len(self.counters), "sum"
+        )
+        self.counters = _combine(pc.add(self.counters, increments))
+
+    def estimate(self, hashes: ArrowArray) -> ArrowArray:
+        """Estimated count of each mixed hash."""
+        return pc.min_element_wise(
+            *(pc.take(self.counters, slots) for slots in self._slots(hashes))
+        )
+
+
+def _distinct_keys(table: pa.Table, vars: Collection[str]) -> tuple[pa.Table, ArrowArray]:
+    """Distinct keys of `table` by hash, with the number of rows of each."""
+    agg = table.group_by(HASH_COL, use_threads=False).aggregate(
+        [(var, "first") for var in vars] + [(HASH_COL, "count")]
+    )
+    keys = pa.table({var: agg[f"{var}_first"] for var in vars} | {HASH_COL: agg[HASH_COL]})
+    return keys, agg[f"{HASH_COL}_count"]
+
+
+class FreqSketch:
+    """Bounded memory frequency profile of one dataset.
+
+    Counts are estimated with a Count-Min sketch, distinct keys with HyperLogLog, and the
+    `capacity` keys with the highest estimated counts are kept as heavy hitter candidates.
+    """
+
+    def __init__(
+        self, vars: Collection[str], width: int, depth: int, precision: int, capacity: int
+    ) -> None:
+        self.vars = list(vars)
+        self.capacity = capacity
+        self.counts = CountMinSketch(width, depth)
+        self.distinct = HyperLogLog(precision)
+        self.candidates: pa.Table | None = None
+
+    def update(self, batch: pa.RecordBatch | pa.Table) -> None:
+        """Add a batch of keys, with their engine hash in the `HASH_COL` column."""
+        table = pa.Table.from_batches([batch]) if isinstance(batch, pa.RecordBatch) else batch
+        table = table.select(self.vars).append_column(HASH_COL, mix64(table[HASH_COL]))
+
+        ## Pre-aggregate the batch, so the sketches are updated once per key:
+        keys, counts = _distinct_keys(table, self.vars)
+        self.counts.update(keys[HASH_COL], counts)
+        self.distinct.update(keys[HASH_COL])
+
+        if self.candidates is not None:
+            keys = _distinct_keys(pa.concat_tables([self.candidates, keys]), self.vars)[0]
+        if keys.num_rows > self.capacity:
+            estimates = self.counts.estimate(keys[HASH_COL])
+            keys = keys.take(pc.select_k_unstable(estimates, self.capacity, [("", "descending")]))
+        self.candidates = keys
+
+    def update_many(self, batches: Iterable[pa.RecordBatch | pa.Table]) -> FreqSketch:
+        """Add every batch, returning the sketch."""
+        for batch in batches:
+            self.update(batch)
+        return self
+
+
+def compare_sketches(
+    sketch1: FreqSketch, sketch2: FreqSketch, top_k: int, analysis_cols: Collection[str]
+) -> SketchResults:
+    """Compare two sketches of the same dimensions.
+
+    The heavy hitter candidates of both sketches are compared by their estimated counts,
+    keeping the `top_k` drifting the most.
+    """
+    vars = sketch1.vars
+    tables = [sketch.candidates for sketch in (sketch1, sketch2) if sketch.candidates is not None]
+    if tables:
+        keys = _distinct_keys(pa.concat_tables(tables), vars)[0]
+    else:
+        keys = pa.table(
+            {var: pa.array([], pa.null()) for var in vars} | {HASH_COL: pa.array([], pa.uint64())}
+        )
+
+    n1 = sketch1.counts.estimate(keys[HASH_COL])
+    n2 = sketch2.counts.estimate(keys[HASH_COL])
+    real_diff = pc.subtract(n2, n1)
+    pct_diff = pc.divide(pc.cast(real_diff, pa.float64()), pc.cast(pc.add(n1, n2), pa.float64()))
+    data = pa.table(
+        {var: keys[var] for var in vars}
+        | {
+            "n1": n1,
+            "n2": n2,
+            "real_diff": real_diff,
+            "abs_diff": pc.abs(real_diff),
+            "pct_diff": pct_diff,
+            "abs_pct_diff": pc.abs(pct_diff),
+        }
+    )
+
+    distinct1 = sketch1.distinct.estimate()
+    distinct2 = sketch2.distinct.estimate()
+    union = sketch1.distinct.merge(sketch2.distinct).estimate()
+    return SketchResults(
+        vars=vars,
+        analysis_cols=analysis_cols,
+        data=data.sort_by([("abs_diff", "descending")]).slice(0, top_k),
+        total1=sketch1.counts.total,
+        total2=sketch2.counts.total,
+        distinct1=round(distinct1),
+        distinct2=round(distinct2),
+        new_distinct=round(max(union - distinct1, 0)),
+        vanished_distinct=round(max(union - distinct2, 0)),
+        distinct_error=round(sketch1.distinct.relative_error * union),
+        count_error1=math.ceil(sketch1.counts.epsilon * sketch1.counts.total),
+        count_error2=math.ceil(sketch2.counts.epsilon * sketch2.counts.total),
+        confidence=sketch1.counts.confidence,
+    )
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import json
+import tempfile
 from abc import ABC, abstractmethod
 from enum import Enum
 from typing import TYPE_CHECKING, Any, Literal
 
 import pyarrow as pa
+from pyarrow import csv as pa_csv
 
 if TYPE_CHECKING:
-    from collections.abc import Collection
+    from collections.abc import Collection, Iterator, Sequence
 
     import psycopg2
     from duckdb import DuckDBPyConnection
@@ -15,6 +18,10 @@ if TYPE_CHECKING:
 
 
 class _SQLConnectionProtocol(ABC):
+    ## Columnar engines read only the referenced columns, so a query per column costs no
+    ## more I/O than one wide scan:
+    columnar: bool = False
+
     @classmethod
     @abstractmethod
     def get_tables(cls, con: Any) -> tuple[str, ...]:
@@ -35,8 +42,62 @@ class _SQLConnectionProtocol(ABC):
     def materialize(cls, con: Any, query: str, cols: Collection[str]) -> IntoFrame:
         """Return a query as arrow. Must be implemented by subclasses."""
 
+    @classmethod
+    @abstractmethod
+    def stream(
+        cls, con: Any, query: str, cols: Collection[str], batch_size: int
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream a query as arrow record batches of about `batch_size` rows."""
+
+    @staticmethod
+    @abstractmethod
+    def hash_key(vars: Collection[str]) -> str:
+        """SQL expression of a 64 bit hash of the columns `vars`."""
+
+    @staticmethod
+    @abstractmethod
+    def any_value(col: str) -> str:
+        """SQL aggregate of any one value of `col` in a group."""
+
+    @staticmethod
+    @abstractmethod
+    def sample(table: str, fraction: float) -> str:
+        """Reference to `table` sampling each row independently with probability `fraction`."""
+
+    @classmethod
+    @abstractmethod
+    def fingerprint(cls, con: Any, table: str) -> str:
+        """Cheap fingerprint of `table`, changing whenever its rows change."""
+
+    @classmethod
+    @abstractmethod
+    def columns(cls, con: Any, table: str) -> tuple[str, ...]:
+        """Names of the columns of `table`, in order."""
+
+    @staticmethod
+    @abstractmethod
+    def quantile(col: str, prob: float) -> str:
+        """SQL aggregate of the continuous quantile of `col` at `prob`, as a double."""
+
+    @staticmethod
+    @abstractmethod
+    def bucket(col: str, edges: Sequence[float]) -> str:
+        """SQL expression of the number of sorted `edges` at or below `col`."""
+
+    @staticmethod
+    @abstractmethod
+    def fork(con: Any) -> Any:
+        """Open another connection to the database of `con`, usable from another thread."""
+
+    @staticmethod
+    @abstractmethod
+    def close(con: Any) -> None:
+        """Close a connection opened for a pool."""
+
 
 class _DuckDBConnectionProtocol(_SQLConnectionProtocol):
+    columnar = True
+
     @classmethod
     def get_tables(cls, con: DuckDBPyConnection) -> tuple[Any, ...]:
         table_data: pa.Table = cls.materialize(con, "SHOW TABLES", "name")
@@ -54,8 +115,81 @@ class _DuckDBConnectionProtocol(_SQLConnectionProtocol):
     def materialize(cls, con: DuckDBPyConnection, query: str, cols: Collection[str]) -> pa.Table:
         return con.sql(query).arrow()
 
+    @classmethod
+    def stream(
+        cls, con: DuckDBPyConnection, query: str, cols: Collection[str], batch_size: int
+    ) -> Iterator[pa.RecordBatch]:
+        yield from con.sql(query).fetch_arrow_reader(batch_size)
+
+    @staticmethod
+    def hash_key(vars: Collection[str]) -> str:
+        return f"hash({', '.join(vars)})"
+
+    @staticmethod
+    def any_value(col: str) -> str:
+        return f"ANY_VALUE({col})"
+
+    @staticmethod
+    def sample(table: str, fraction: float) -> str:
+        return f"{table} TABLESAMPLE BERNOULLI ({fraction * 100} PERCENT)"
+
+    @classmethod
+    def fingerprint(cls, con: DuckDBPyConnection, table: str) -> str:
+        """Database file, name and row count of `table`, and a hash of its rows in memory.
+
+        In place updates that keep the row count of a table in a database file are not
+        detected. In-memory databases are all named alike and vanish with the process, so
+        their rows are hashed instead, regardless of order.
+        """
+        db_query = "SELECT path FROM duckdb_databases() WHERE database_name = current_database()"
+        path = cls.materialize(con, db_query, ("path",))["path"][0].as_py()
+        content = "CAST(sum(hash(*COLUMNS(*))) AS VARCHAR)" if path is None else "NULL"
+        query = f"SELECT count(*) AS n, {content} AS content FROM {table}"
+        rows = cls.materialize(con, query, ("n", "content")).to_pylist()
+        return json.dumps([path, table, *rows])
+
+    @classmethod
+    def columns(cls, con: DuckDBPyConnection, table: str) -> tuple[str, ...]:
+        return tuple(con.sql(f"SELECT * FROM {table} LIMIT 0").columns)
+
+    @staticmethod
+    def quantile(col: str, prob: float) -> str:
+        return f"CAST(quantile_cont({col}, {prob!r}) AS DOUBLE PRECISION)"
+
+    @staticmethod
+    def bucket(col: str, edges: Sequence[float]) -> str:
+        return " + ".join(f"CAST({col} >= {edge!r} AS INTEGER)" for edge in edges) or "0"
+
+    @staticmethod
+    def fork(con: DuckDBPyConnection) -> DuckDBPyConnection:
+        """A cursor, i.e. a duplicate connection to the same in-process database."""
+        return con.cursor()
+
+    @staticmethod
+    def close(con: DuckDBPyConnection) -> None:
+        con.close()
+
+
+## Postgres type OIDs with a lossless CSV representation; everything else is read as a string.
+_PG_TYPE_OIDS: dict[int, pa.DataType] = {
+    16: pa.bool_(),
+    20: pa.int64(),
+    21: pa.int16(),
+    23: pa.int32(),
+    700: pa.float32(),
+    701: pa.float64(),
+    1082: pa.date32(),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+}
+
 
 class _Psycopg2ConnectionProtocol(_SQLConnectionProtocol):
+    ## `COPY` output is spooled in memory up to this size, then spilled to disk:
+    spool_max_size: int = 64 * 1024 * 1024
+    ## Bytes of CSV parsed into each arrow record batch:
+    block_size: int = 8 * 1024 * 1024
+
     @classmethod
     def get_tables(cls, con: psycopg2.connect) -> tuple[Any, ...]:
         table_data: pa.Table = cls.materialize(
@@ -73,17 +207,140 @@ class _Psycopg2ConnectionProtocol(_SQLConnectionProtocol):
     def exec(con: psycopg2.connect, query: str) -> None:
         con.execute(query)
 
+    @classmethod
+    def describe(
+        cls, con: psycopg2.extensions.cursor, query: str, cols: Collection[str]
+    ) -> pa.Schema:
+        """Resolve the arrow schema of a query without running it."""
+        con.execute(f"SELECT * FROM ({query}) AS described LIMIT 0")
+        fields: list[pa.Field[Any]] = []
+        for col, desc in zip(cols, con.description, strict=True):
+            if desc.type_code == 1700 and desc.precision is not None:  # constrained numeric
+                dtype: pa.DataType = pa.decimal128(desc.precision, desc.scale)
+            elif desc.type_code == 1700:
+                dtype = pa.float64()
+            else:
+                dtype = _PG_TYPE_OIDS.get(desc.type_code, pa.string())
+            fields.append(pa.field(col, dtype))
+        return pa.schema(fields)
+
     @classmethod
     def materialize(
         cls, con: psycopg2.extensions.cursor, query: str, cols: Collection[str]
     ) -> pa.Table:
-        con.execute(query)
-        raw: tuple[Any, ...] = con.fetchall()
-        data: dict[str, Any] = {col: [] for col in cols}
-        for row in raw:
-            for col, value in zip(cols, row, strict=False):
-                data[col].append(value)
-        return pa.Table.from_pydict(data)
+        """Bulk transfer a query with `COPY ... TO STDOUT`, parsed into arrow record batches.
+
+        The CSV stream is spooled (spilling to disk past `spool_max_size`) and converted
+        block by block, so no python object is created per value.
+        """
+        schema = cls.describe(con, query, cols)
+        return pa.Table.from_batches(cls._copy_batches(con, query, schema), schema=schema)
+
+    @classmethod
+    def stream(
+        cls, con: psycopg2.extensions.cursor, query: str, cols: Collection[str], batch_size: int
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream a query through `COPY`, one CSV block of about `batch_size` rows at a time.
+
+        Batch sizes are approximate, since blocks are sized in bytes.
+        """
+        schema = cls.describe(con, query, cols)
+        ## Assume about 64 bytes of CSV per row:
+        yield from cls._copy_batches(con, query, schema, block_size=64 * batch_size)
+
+    @classmethod
+    def _copy_batches(
+        cls,
+        con: psycopg2.extensions.cursor,
+        query: str,
+        schema: pa.Schema,
+        block_size: int | None = None,
+    ) -> Iterator[pa.RecordBatch]:
+        with tempfile.SpooledTemporaryFile(max_size=cls.spool_max_size) as spool:
+            con.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT CSV)", spool)
+            if not spool.tell():  # pyarrow refuses to read an empty file
+                return
+            spool.seek(0)
+
+            ## Postgres writes NULL unquoted and empty strings quoted:
+            yield from pa_csv.open_csv(
+                spool,
+                read_options=pa_csv.ReadOptions(
+                    column_names=schema.names, block_size=block_size or cls.block_size
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=schema,
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=False,
+                    true_values=["t"],
+                    false_values=["f"],
+                ),
+            )
+
+    @staticmethod
+    def hash_key(vars: Collection[str]) -> str:
+        ## A row renders NULL distinct from the empty string:
+        return f"hashtextextended(ROW({', '.join(vars)})::text, 0)"
+
+    @staticmethod
+    def any_value(col: str) -> str:
+        """The least one-element array, since `ANY_VALUE` requires Postgres 16.
+
+        `MIN` is not defined on booleans or uuids, arrays of any type with a btree
+        ordering are, unlike `array_agg`, which collects every value of the group.
+        """
+        return f"(MIN(ARRAY[{col}]))[1]"
+
+    @staticmethod
+    def sample(table: str, fraction: float) -> str:
+        return f"{table} TABLESAMPLE BERNOULLI ({fraction * 100})"
+
+    @classmethod
+    def fingerprint(cls, con: psycopg2.extensions.cursor, table: str) -> str:
+        """Modification counters and file of a table, or the row count of anything else.
+
+        The counters change on every insert, update and delete, the file on truncation.
+        They are flushed by the statistics system, lagging commits by up to a second.
+        """
+        stats = f"""--sql
+        SELECT current_database() AS db, pg_relation_filenode(relid) AS filenode,
+            n_tup_ins, n_tup_upd, n_tup_del
+        FROM pg_stat_all_tables
+        WHERE relid = to_regclass('{table}')
+        """
+        cols = ("db", "filenode", "n_tup_ins", "n_tup_upd", "n_tup_del")
+        rows = cls.materialize(con, stats, cols).to_pylist()
+        if not rows:
+            query = f"SELECT current_database() AS db, count(*) AS n FROM {table}"
+            rows = cls.materialize(con, query, ("db", "n")).to_pylist()
+        return json.dumps(rows)
+
+    @classmethod
+    def columns(cls, con: psycopg2.extensions.cursor, table: str) -> tuple[str, ...]:
+        con.execute(f"SELECT * FROM {table} LIMIT 0")
+        return tuple(desc.name for desc in con.description)
+
+    @staticmethod
+    def quantile(col: str, prob: float) -> str:
+        return f"CAST(percentile_cont({prob!r}) WITHIN GROUP (ORDER BY {col}) AS DOUBLE PRECISION)"
+
+    @staticmethod
+    def bucket(col: str, edges: Sequence[float]) -> str:
+        """Binary search of the edges with `width_bucket`."""
+        if not edges:
+            return "0"
+        return f"width_bucket({col}, ARRAY[{', '.join(map(repr, edges))}]::DOUBLE PRECISION[])"
+
+    @staticmethod
+    def fork(con: psycopg2.extensions.cursor) -> psycopg2.extensions.cursor:
+        """Cursors of one connection run one query at a time, and its DSN hides the password."""
+        msg = "Postgres connections cannot be forked, pass a `connect` factory of cursors."
+        raise NotImplementedError(msg)
+
+    @staticmethod
+    def close(con: psycopg2.extensions.cursor) -> None:
+        con.close()
+        con.connection.close()
 
 
 class SQLConnections(Enum):
@@ -92,3 +349,5 @@ class SQLConnections(Enum):
 
 
 SQL_CONNECTIONS = Literal["PSYCOPG2", "DUCKDB"]
+
+SQL_STRATEGIES = Literal["pushdown", "materialize", "isolated"]
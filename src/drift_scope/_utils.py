@@ -1,20 +1,153 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Literal
 
 import narwhals as nw
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Collection, Iterable, Iterator
     from typing import Any
 
     from narwhals.typing import IntoDataFrameT
 
+KEY_ENCODINGS = Literal["columns", "hash"]
+
+## Column of the 64 bit hash of encoded multi-column keys:
+KEY_COL = "_key"
+
 
 def stringify_container(x: Iterable[str]) -> str:
     return ",".join(x)
 
 
+def unique_dimension_sets(vars_many: Iterable[Collection[str]]) -> tuple[tuple[str, ...], ...]:
+    """Deduplicate dimension sets, preserving the order they were requested in."""
+    return tuple(dict.fromkeys(tuple(vars) for vars in vars_many))
+
+
+def union_dimensions(vars_many: Iterable[Collection[str]]) -> tuple[str, ...]:
+    """Union of the variables of many dimension sets, preserving first appearance."""
+    return tuple(dict.fromkeys(var for vars in vars_many for var in vars))
+
+
+def with_freq_diffs(
+    counts: nw.DataFrame[Any] | nw.LazyFrame[Any],
+) -> nw.DataFrame[Any] | nw.LazyFrame[Any]:
+    """Derive the difference columns from the `n1` and `n2` counts."""
+    return (
+        counts.with_columns(real_diff=nw.col("n2") - nw.col("n1"))
+        .with_columns(
+            abs_diff=nw.col("real_diff").abs(),
+            pct_diff=((nw.col("n2") - nw.col("n1")) * 100) / (nw.col("n1") + nw.col("n2")) / 100,
+        )
+        .with_columns(abs_pct_diff=nw.col("pct_diff").abs())
+    )
+
+
+def with_snapshot_diffs(
+    counts: nw.DataFrame[Any] | nw.LazyFrame[Any], targets: int
+) -> nw.DataFrame[Any] | nw.LazyFrame[Any]:
+    """Derive the difference columns of every target count `n_i` against `n_base`.
+
+    A key absent from both the baseline and a target did not drift in it, its
+    `pct_diff_i` is 0.
+    """
+    base = nw.col("n_base")
+    diffs = {}
+    for i in range(1, targets + 1):
+        n = nw.col(f"n_{i}")
+        diffs[f"real_diff_{i}"] = n - base
+        diffs[f"pct_diff_{i}"] = (
+            nw.when(n + base == 0).then(nw.lit(0.0)).otherwise((n - base) / (n + base))
+        )
+    return counts.with_columns(**diffs).with_columns(
+        max_abs_pct_diff=nw.max_horizontal(
+            *(nw.col(f"pct_diff_{i}").abs() for i in range(1, targets + 1))
+        )
+    )
+
+
+def validate_sample(sample: float | None) -> None:
+    """Raise unless `sample` is a fraction of rows in (0, 1], or None to scan everything."""
+    if sample is not None and not 0 < sample <= 1:
+        msg = f"`sample` must be a fraction in (0, 1], not {sample!r}."
+        raise ValueError(msg)
+
+
+def with_sample_estimates(
+    freq: nw.DataFrame[Any] | nw.LazyFrame[Any], sample: float, confidence: float
+) -> nw.DataFrame[Any] | nw.LazyFrame[Any]:
+    """Scale a comparison of sampled rows up to the full datasets, with bounds on `pct_diff`.
+
+    Given `n1 + n2` sampled rows of a key, `n2` is binomial with the share of the key's rows
+    in the second dataset, so `pct_diff = 2 * share - 1` is bounded by the Wilson score
+    interval of that share. `pct_diff` itself is unchanged by scaling.
+    """
+    z2 = NormalDist().inv_cdf((1 + confidence) / 2) ** 2
+    m = nw.col("n1") + nw.col("n2")
+    share = nw.col("n2") / m
+    center = (share + z2 / (2 * m)) / (1 + z2 / m)
+    half_width = (z2 * (share * (1 - share) / m + z2 / (4 * m * m))) ** 0.5 / (1 + z2 / m)
+    return freq.with_columns(
+        pct_diff_lower=2 * (center - half_width) - 1,
+        pct_diff_upper=2 * (center + half_width) - 1,
+    ).with_columns((nw.col("n1", "n2", "real_diff", "abs_diff") / sample).cast(nw.Float64))
+
+
+def top_rows(
+    frame: nw.DataFrame[Any] | nw.LazyFrame[Any],
+    *,
+    sort_by: str | None,
+    descending: bool,
+    top_n: int | None,
+) -> nw.DataFrame[Any]:
+    """The first `top_n` rows of `frame` ordered by `sort_by`, collecting only those.
+
+    Eager polars, pyarrow and pandas (numeric `sort_by` only) frames select the top rows
+    natively, partially ordered, and only those are sorted. Lazy plans get the sort and
+    limit pushed into them, which their engines execute as a top-k.
+    """
+    if top_n is not None and top_n < 1:
+        msg = f"`top_n` must be positive, not {top_n!r}."
+        raise ValueError(msg)
+    if sort_by is None:
+        limited = frame if top_n is None else frame.head(top_n)
+        return limited.collect() if isinstance(limited, nw.LazyFrame) else limited
+
+    if top_n is not None and isinstance(frame, nw.DataFrame):
+        native = frame.to_native()
+        if frame.implementation is nw.Implementation.POLARS:
+            frame = nw.from_native(native.top_k(top_n, by=sort_by, reverse=not descending))
+        elif frame.implementation is nw.Implementation.PYARROW:
+            import pyarrow.compute as pc
+
+            order: Literal["ascending", "descending"] = "descending" if descending else "ascending"
+            indices = pc.select_k_unstable(native, top_n, sort_keys=[(sort_by, order)])
+            frame = nw.from_native(native.take(indices))
+        elif (
+            frame.implementation is nw.Implementation.PANDAS and frame.schema[sort_by].is_numeric()
+        ):
+            top = native.nlargest if descending else native.nsmallest
+            frame = nw.from_native(top(top_n, sort_by))
+
+    ordered = frame.sort(sort_by, descending=descending, nulls_last=True)
+    limited = ordered if top_n is None else ordered.head(top_n)
+    return limited.collect() if isinstance(limited, nw.LazyFrame) else limited
+
+
+def pages(frame: nw.DataFrame[Any], page_size: int | None) -> Iterator[nw.DataFrame[Any]]:
+    """Split `frame` into zero copy slices of `page_size` rows, at least one if empty."""
+    if page_size is None:
+        yield frame
+        return
+    if page_size < 1:
+        msg = f"`page_size` must be positive, not {page_size!r}."
+        raise ValueError(msg)
+    for start in range(0, max(len(frame), 1), page_size):
+        yield frame[start : start + page_size]
+
+
 def extract_rows(data: IntoDataFrameT) -> tuple[Any, ...]:
     native = nw.from_native(data)
     # TODO: If named were true, it could be better
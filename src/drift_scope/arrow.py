@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import narwhals as nw
+import pyarrow as pa
+import pyarrow.acero as ac
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from drift_scope._sketch import HASH_COL, stable_hashes
+from drift_scope._utils import (
+    union_dimensions,
+    unique_dimension_sets,
+    validate_sample,
+    with_freq_diffs,
+)
+from drift_scope.base import BaseComparator
+from drift_scope.results import FreqResults
+from drift_scope.tracing import record_frame, traced
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterable, Iterator, Sequence
+    from typing import Any
+
+    from drift_scope.profiles import ProfileStore
+    from drift_scope.results import Results
+
+type ArrowSource = ds.Dataset | pa.RecordBatchReader
+
+
+class _RunningCounts:
+    """Running hash aggregate of count columns by key, fed one partial aggregate at a time.
+
+    Partial aggregates are buffered and merged into the running aggregate once they hold
+    `merge_rows` rows, or as many rows as the running aggregate, whichever is more. Memory
+    stays proportional to the number of distinct keys, and every key is merged a
+    logarithmic number of times.
+    """
+
+    def __init__(self, vars: Collection[str], counts: Collection[str], merge_rows: int) -> None:
+        self.vars = list(vars)
+        self.counts = list(counts)
+        self.merge_rows = merge_rows
+        self._running: pa.Table | None = None
+        self._pending: list[pa.Table] = []
+        self._pending_rows = 0
+
+    def add(self, partial: pa.Table) -> None:
+        """Add a partial aggregate of `vars` and the count columns."""
+        self._pending.append(partial)
+        self._pending_rows += partial.num_rows
+        running_rows = 0 if self._running is None else self._running.num_rows
+        if self._pending_rows >= max(self.merge_rows, running_rows):
+            self._merge()
+
+    def _merge(self) -> None:
+        tables = self._pending if self._running is None else [self._running, *self._pending]
+        merged = (
+            pa.concat_tables(tables, promote_options="permissive")
+            .group_by(self.vars, use_threads=False)
+            .aggregate([(col, "sum") for col in self.counts])
+            .select([*self.vars, *(f"{col}_sum" for col in self.counts)])
+        )
+        self._running = merged.rename_columns([*self.vars, *self.counts])
+        self._pending, self._pending_rows = [], 0
+
+    def result(self) -> pa.Table | None:
+        """The aggregate of everything added, or None if nothing was added."""
+        if self._pending:
+            self._merge()
+        return self._running
+
+
+class ArrowComparator(BaseComparator):
+    """Compare arrow datasets or record batch streams larger than memory.
+
+    Both sources are streamed batch by batch into a hash aggregate of `n1` and `n2` by key,
+    so memory is bounded by the number of distinct keys, not by the number of rows.
+    Datasets are scanned with projection pushdown, reading only the compared columns, i.e.
+    of a partitioned parquet directory opened with `pyarrow.dataset.dataset`.
+
+    A `RecordBatchReader` is consumed by its first scan, compare every dimension set of a
+    reader with one `comp_freq_many`, coarser sets are then rolled up from the cache.
+
+    With a `profile_store`, the counts of a file based `df1` are stored once per dimension
+    set and the paths, sizes and modification times of its files.
+    """
+
+    ## Rows read per batch of each source:
+    stream_batch_size: int = 128 * 1024
+
+    ## Rows of batch aggregates buffered before merging them into the running aggregate:
+    stream_merge_rows: int = 1_000_000
+
+    def __init__(
+        self,
+        df1: ArrowSource,
+        df2: ArrowSource,
+        profile_store: ProfileStore | None = None,
+    ) -> None:
+        super().__init__(profile_store=profile_store)
+        for name, source in (("df1", df1), ("df2", df2)):
+            if not isinstance(source, ds.Dataset | pa.RecordBatchReader):
+                msg = (
+                    f"`{name}` must be a pyarrow Dataset or RecordBatchReader, "
+                    f"not {type(source).__name__}."
+                )
+                raise TypeError(msg)
+        self.df1 = df1
+        self.df2 = df2
+        self._consumed: list[pa.RecordBatchReader] = []
+
+        self.results: list[Results] = []
+
+    @traced
+    def comp_freq(self, vars: Collection[str], sample: float | None = None) -> None:
+        """Compare the frequency between two streamed sources among variables `vars`.
+
+        Dimension sets covered by an earlier comparison are rolled up from the cache. A
+        `sample` keeps each streamed row with that probability.
+        """
+        validate_sample(sample)
+        if sample is not None:
+            counts = self._count_freq(vars, sample)
+            self._append_sampled_freq(vars, with_freq_diffs(counts).to_native(), sample)
+            return
+
+        if self._append_cached_freq(vars):
+            return
+
+        if self.profile_store is not None:
+            data = self._compare_to_profile(self.profile_store, vars, self.df1, self.df2)
+            self._append_freq(vars, data.to_native())
+            return
+
+        self._append_freq(vars, with_freq_diffs(self._count_freq(vars)).to_native())
+
+    @traced
+    def comp_freq_many(self, vars_many: Iterable[Collection[str]]) -> None:
+        """Compare many dimension sets from a single scan of each source.
+
+        Both sources are aggregated once by the union of all dimensions, every dimension
+        set is then rolled up from that aggregate. Dimension sets covered by an earlier
+        comparison are rolled up from the cache instead. With a `profile_store`, every
+        dimension set is compared to the stored profile of `df1`, as `comp_freq` does.
+        """
+        dimension_sets = unique_dimension_sets(vars_many)
+        data: dict[tuple[str, ...], Any] = {
+            vars: self.freq_cache.rollup(vars, self.comp_freq_analysis_cols)
+            for vars in dimension_sets
+        }
+
+        missing = [vars for vars in dimension_sets if data[vars] is None]
+        if self.profile_store is not None:
+            for vars in missing:
+                profiled = self._compare_to_profile(self.profile_store, vars, self.df1, self.df2)
+                data[vars] = profiled.to_native()
+        elif len(missing) == 1:
+            data[missing[0]] = with_freq_diffs(self._count_freq(missing[0])).to_native()
+        elif missing:
+            counts = self._count_freq(union_dimensions(missing))
+            for vars in missing:
+                rolled_up = counts.group_by(*vars).agg(nw.col("n1", "n2").sum())
+                data[vars] = with_freq_diffs(rolled_up).to_native()
+
+        for vars in dimension_sets:
+            if vars in missing:
+                self._append_freq(vars, data[vars])
+            else:
+                self.results.append(
+                    FreqResults(
+                        vars=vars, analysis_cols=self.comp_freq_analysis_cols, data=data[vars]
+                    )
+                )
+
+    def _columns(self) -> tuple[Collection[str], Collection[str]]:
+        return self.df1.schema.names, self.df2.schema.names
+
+    def _comp_freq_columns(self, cols: Collection[str]) -> None:
+        """Count every column on its own, in a single scan of readers.
+
+        Readers can be scanned only once, every column is counted from that scan. Datasets
+        are compared column by column instead, reading one column each.
+        """
+        sources = {"n1": self.df1, "n2": self.df2}
+        if all(isinstance(source, ds.Dataset) for source in sources.values()):
+            super()._comp_freq_columns(cols)
+            return
+
+        dimension_sets = [(col,) for col in cols]
+        with self._span("scan") as span:
+            tables = self._stream_counts(dimension_sets, sources)
+            for counts in tables:
+                record_frame(span, counts)
+        for vars, counts in zip(dimension_sets, tables, strict=True):
+            data = with_freq_diffs(nw.from_native(counts, eager_only=True))
+            self._append_freq(vars, data.to_native())
+
+    def _profile_key(self) -> tuple[str, str]:
+        """File based datasets are keyed by their files, sizes and modification times."""
+        if not isinstance(self.df1, ds.FileSystemDataset):
+            msg = "Profile stores require `df1` to be a file based pyarrow Dataset."
+            raise NotImplementedError(msg)
+
+        files = sorted(self.df1.files)
+        infos = self.df1.filesystem.get_file_info(files)
+        fingerprint = [(info.size, info.mtime_ns) for info in infos]
+        return f"arrow:{json.dumps(files)}", json.dumps(fingerprint)
+
+    def _count_dataset(self, vars: Collection[str], dataset: Any) -> nw.DataFrame[Any]:
+        return nw.from_native(self._count(vars, {"n": dataset}), eager_only=True)
+
+    def _hashed_key_batches(
+        self, vars: Collection[str]
+    ) -> tuple[Iterable[pa.RecordBatch | pa.Table], Iterable[pa.RecordBatch | pa.Table]]:
+        """Stream the keys of each source with a hash per row, of arrow kernels."""
+        return self._hash_batches(self.df1, vars), self._hash_batches(self.df2, vars)
+
+    def _hash_batches(
+        self, source: ArrowSource, vars: Collection[str]
+    ) -> Iterable[pa.RecordBatch | pa.Table]:
+        for batch in self._scan(source, vars):
+            yield batch.append_column(HASH_COL, stable_hashes(batch))
+
+    def _scan(
+        self, source: ArrowSource, vars: Collection[str], sample: float | None = None
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream the `vars` columns of `source`, keeping each row with probability `sample`.
+
+        Datasets only read `vars`, readers are consumed and projected batch by batch.
+        """
+        if isinstance(source, pa.RecordBatchReader):
+            if any(source is consumed for consumed in self._consumed):
+                msg = (
+                    "A RecordBatchReader can only be scanned once, "
+                    "compare all its dimension sets with one `comp_freq_many`."
+                )
+                raise ValueError(msg)
+            self._consumed.append(source)
+            batches: Iterable[pa.RecordBatch] = (batch.select(list(vars)) for batch in source)
+        else:
+            batches = source.to_batches(columns=list(vars), batch_size=self.stream_batch_size)
+
+        for batch in batches:
+            if sample is None:
+                yield batch
+            else:
+                yield batch.filter(pc.less(pc.random(batch.num_rows), sample))
+
+    def _count_freq(self, vars: Collection[str], sample: float | None = None) -> nw.DataFrame[Any]:
+        """Stream both sources, or samples of them, into one aggregate of `n1` and `n2`."""
+        with self._span("scan") as span:
+            counts = self._count(vars, {"n1": self.df1, "n2": self.df2}, sample)
+            record_frame(span, counts)
+        return nw.from_native(counts, eager_only=True)
+
+    def _count(
+        self, vars: Collection[str], sources: dict[str, ArrowSource], sample: float | None = None
+    ) -> pa.Table:
+        """Count the rows of each source by `vars` into its count column, in one aggregate.
+
+        Datasets are counted by a native acero plan, scanning every source into one
+        streaming hash aggregate. Readers, and samples, are streamed through python into a
+        running aggregate instead, acero cannot source them in this pyarrow version.
+        """
+        counts = list(sources)
+        schema = next(iter(sources.values())).schema
+        datasets = {
+            count: source for count, source in sources.items() if isinstance(source, ds.Dataset)
+        }
+        if sample is None and len(datasets) == len(sources):
+            scans = [
+                _tagged_scan(source, vars, counts, count, schema, self.stream_batch_size)
+                for count, source in datasets.items()
+            ]
+            aggregate = ac.AggregateNodeOptions(
+                [(count, "hash_sum", None, count) for count in counts], keys=list(vars)
+            )
+            if len(scans) > 1:
+                scans = [ac.Declaration("union", None, inputs=scans)]  # type: ignore[arg-type]
+            plan = ac.Declaration.from_sequence([*scans, ac.Declaration("aggregate", aggregate)])
+            return plan.to_table().select([*vars, *counts])
+
+        return self._stream_counts([vars], sources, sample)[0]
+
+    def _stream_counts(
+        self,
+        dimension_sets: Sequence[Collection[str]],
+        sources: dict[str, ArrowSource],
+        sample: float | None = None,
+    ) -> list[pa.Table]:
+        """Count each of `dimension_sets` like `_count`, streaming every source once."""
+        counts = list(sources)
+        schema = next(iter(sources.values())).schema
+        running = [_RunningCounts(vars, counts, self.stream_merge_rows) for vars in dimension_sets]
+        for count, source in sources.items():
+            for batch in self._scan(source, union_dimensions(dimension_sets), sample):
+                for vars, aggregate in zip(dimension_sets, running, strict=True):
+                    partial = _count_batch(batch, vars, count)
+                    zeros = pa.repeat(pa.scalar(0, pa.int64()), partial.num_rows)  # type: ignore[call-overload]
+                    for other in counts:
+                        if other != count:
+                            partial = partial.append_column(other, zeros)
+                    aggregate.add(partial.select([*vars, *counts]))
+
+        results = [aggregate.result() for aggregate in running]
+        return [
+            _empty_counts(schema, vars, counts) if result is None else result
+            for vars, result in zip(dimension_sets, results, strict=True)
+        ]
+
+
+def _tagged_scan(
+    source: ds.Dataset,
+    vars: Collection[str],
+    counts: Collection[str],
+    count: str,
+    schema: pa.Schema,
+    batch_size: int,
+) -> ac.Declaration:
+    """Acero scan of only the `vars` of `source`, cast to `schema`, with a 1 in its `count`.
+
+    The other count columns are 0, so summing them counts every source separately.
+    """
+    keys = [pc.field(var).cast(schema.field(var).type) for var in vars]
+    tags = [pc.scalar(int(col == count)) for col in counts]
+    return ac.Declaration.from_sequence(
+        [
+            ac.Declaration(
+                "scan",
+                ac.ScanNodeOptions(source, columns=list(vars), batch_size=batch_size),  # type: ignore[attr-defined]
+            ),
+            ac.Declaration("project", ac.ProjectNodeOptions(keys + tags, [*vars, *counts])),
+        ]
+    )
+
+
+def _count_batch(batch: pa.RecordBatch, vars: Collection[str], count: str) -> pa.Table:
+    """Count the rows of `batch` by `vars` into the column `count`."""
+    grouped = pa.Table.from_batches([batch]).group_by(list(vars), use_threads=False)
+    counts = grouped.aggregate([([], "count_all")])  # type: ignore[arg-type]
+    return counts.select([*vars, "count_all"]).rename_columns([*vars, count])
+
+
+def _empty_counts(schema: pa.Schema, vars: Collection[str], counts: Collection[str]) -> pa.Table:
+    """An aggregate without rows, of `vars` typed after `schema` and the count columns."""
+    return pa.table(
+        {var: pa.array([], schema.field(var).type) for var in vars}
+        | {col: pa.array([], pa.int64()) for col in counts}
+    )
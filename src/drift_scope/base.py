@@ -1,22 +1,108 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, cast
 
-import rich
+import narwhals as nw
+
+from drift_scope._cache import FreqCache
+from drift_scope._utils import unique_dimension_sets, with_freq_diffs, with_sample_estimates
+from drift_scope.results import FreqResults, print_reports
+from drift_scope.tracing import record_frame, start_span, traced
 
 if TYPE_CHECKING:
-    from collections.abc import Collection
+    from collections.abc import Collection, Iterable, Sequence
+    from contextlib import AbstractContextManager
+    from typing import Any
+
+    import pyarrow as pa
 
+    from drift_scope.profiles import ProfileStore
     from drift_scope.results import Results
+    from drift_scope.tracing import Span, Tracer
 
 
-class BaseComparator(ABC):
-    """Base class for comparing data."""
+class ResultsComparator(ABC):
+    """Base class of every comparator appending results.
+
+    Holds what pairwise and snapshot comparators share: the tracer, the roll-up cache of
+    frequency comparisons, and collecting and reporting the results.
+    """
 
     @abstractmethod
     def __init__(self) -> None:
         self.results: list[Results]
+        self.freq_cache = FreqCache(max_bytes=self.freq_cache_max_bytes)
+
+    ## Records a span of every operation and its stages when set, nothing when None:
+    tracer: Tracer | None = None
+
+    ## Bound on the comparisons kept to roll coarser dimension sets up from, set 0 to disable:
+    freq_cache_max_bytes: int = 256 * 1024 * 1024
+
+    def _span(self, name: str, **attrs: Any) -> AbstractContextManager[Span | None]:
+        """Time a stage as a span of `tracer`, yielding None without a tracer."""
+        return start_span(self.tracer, name, **attrs)
+
+    @traced
+    def collect(self) -> None:
+        """Execute every comparison that was recorded as a lazy plan."""
+        for result in self.results:
+            result.collect()
+
+    @traced
+    def compile_report(
+        self,
+        abs_pct_diff_threshold: float = 0,
+        *,
+        top_n: int | None = None,
+        sort_by: str | None = None,
+        descending: bool = True,
+        summary_only: bool = False,
+        page_size: int | None = None,
+    ) -> None:
+        """Compile results and print to the console.
+
+        Lazy results are collected first, unless only their `top_n` rows or summaries are
+        reported, which are computed from their plans instead.
+
+        Parameters
+        ----------
+            abs_pct_diff_threshold (float): Only list keys drifting by at least this much.
+            top_n (int, optional): Only list this many keys per result, the most drifting
+                unless `sort_by` is given.
+            sort_by (str, optional): Column to order the keys of each result by.
+            descending (bool): Order `sort_by` descending.
+            summary_only (bool): Print one row of headline measures per result instead.
+            page_size (int, optional): Print a table per this many keys.
+        """
+        if top_n is None and not summary_only:
+            self.collect()
+        with self._span("render"):
+            print_reports(
+                self.results,
+                abs_pct_diff_threshold,
+                top_n=top_n,
+                sort_by=sort_by,
+                descending=descending,
+                summary_only=summary_only,
+                page_size=page_size,
+            )
+
+
+class BaseComparator(ResultsComparator):
+    """Base class for comparing data."""
+
+    @abstractmethod
+    def __init__(self, profile_store: ProfileStore | None = None) -> None:
+        super().__init__()
+        self.profile_store = profile_store
+
+    ## Rows streamed into the sketches per batch by `comp_freq_sketch`:
+    sketch_batch_size: int = 1_000_000
+
+    ## Confidence level of the `pct_diff` bounds of sampled comparisons:
+    sample_confidence: float = 0.95
 
     comp_freq_analysis_cols: tuple[str, ...] = (
         "n1",
@@ -27,13 +113,28 @@ class BaseComparator(ABC):
         "abs_pct_diff",
     )
 
+    comp_freq_sample_analysis_cols: tuple[str, ...] = (
+        "n1",
+        "n2",
+        "real_diff",
+        "abs_diff",
+        "pct_diff",
+        "pct_diff_lower",
+        "pct_diff_upper",
+        "abs_pct_diff",
+    )
+
     @abstractmethod
-    def comp_freq(self, vars: Collection[str]) -> None:
+    def comp_freq(self, vars: Collection[str], sample: float | None = None) -> None:
         """Compare frequencies of variables between datasets.
 
         Parameters
         ----------
             vars (Collection[str]): Variables to compare.
+            sample (float | None): Fraction of rows to sample from each dataset. Counts
+                and differences are scaled up to the full datasets, and `pct_diff` is
+                bounded by `pct_diff_lower` and `pct_diff_upper` at `sample_confidence`.
+                Sampled comparisons bypass the roll-up cache. Scans everything if None.
 
         Returns
         -------
@@ -62,11 +163,296 @@ class BaseComparator(ABC):
         ... check_column_order=False,check_row_order=False)
         """
 
-    def compile_report(self) -> None:
-        """Compile results and print to the console."""
-        console = rich.console.Console()
+    @traced
+    def comp_freq_many(self, vars_many: Iterable[Collection[str]]) -> None:
+        """Compare frequencies of many dimension sets between datasets.
 
-        for result in self.results:
-            console.rule(result.name)
-            # TODO: Add description
-            console.print(result.report_as_table())
+        Engines override this to scan each dataset once for all dimension sets, the
+        default falls back to one `comp_freq` per set.
+
+        Parameters
+        ----------
+            vars_many (Iterable[Collection[str]]): Dimension sets to compare.
+
+        Returns
+        -------
+            None. Appends one result per unique dimension set, in request order.
+
+        Examples
+        --------
+        >>> import polars as pl
+        >>> from drift_scope import DataFrameComparator
+        >>> df1 = pl.DataFrame({'city': ['Austin', 'Dallas'], 'state': ['TX', 'TX']})
+        >>> df2 = pl.DataFrame({'city': ['Austin', 'Reno'], 'state': ['TX', 'NV']})
+        >>> comp = DataFrameComparator(df1, df2)
+        >>> comp.comp_freq_many([('state',), ('city', 'state')])
+        >>> [tuple(result.vars) for result in comp.results]
+        [('state',), ('city', 'state')]
+        """
+        for vars in unique_dimension_sets(vars_many):
+            self.comp_freq(vars)
+
+    @traced
+    def comp_freq_all_columns(
+        self, include: Collection[str] | None = None, exclude: Collection[str] = ()
+    ) -> None:
+        """Compare the frequencies of every column on its own.
+
+        Row stores, i.e. Postgres, count every column as its own grouping set, in one scan
+        of each table. Columnar engines and dataframes compare column by column, reading
+        one column each. Arrow readers, which can be scanned once only, count every column
+        in that scan. Unpivoting into `(column, value)` pairs would scan once as well,
+        but multiplies the rows by the number of columns and hashes every value as a
+        string, which measured 15x slower on DuckDB.
+
+        Parameters
+        ----------
+            include (Collection[str] | None): Columns to compare. Every column in both
+                datasets if None.
+            exclude (Collection[str]): Columns not to compare.
+
+        Returns
+        -------
+            None. Appends one result per column, in column order.
+
+        Examples
+        --------
+        >>> import polars as pl
+        >>> from drift_scope import DataFrameComparator
+        >>> df1 = pl.DataFrame({'product': ['Apple', 'Pear'], 'store': [1, 2], 'id': [1, 2]})
+        >>> df2 = pl.DataFrame({'product': ['Apple', 'Apple'], 'store': [1, 1], 'id': [3, 4]})
+        >>> comp = DataFrameComparator(df1, df2)
+        >>> comp.comp_freq_all_columns(exclude=('id',))
+        >>> [tuple(result.vars) for result in comp.results]
+        [('product',), ('store',)]
+        """
+        cols1, cols2 = self._columns()
+        shared = set(cols2)
+        cols = [
+            col
+            for col in cols1
+            if col in shared and (include is None or col in include) and col not in exclude
+        ]
+        if not cols:
+            msg = "No columns of both datasets are selected to compare."
+            raise ValueError(msg)
+        self._comp_freq_columns(cols)
+
+    @traced
+    def comp_dist(self, vars: Collection[str], bins: int = 10) -> None:
+        """Compare the distributions of numeric variables between datasets.
+
+        Bin edges are the quantiles of the first dataset, then both datasets are counted
+        per bin in the engine, so only the edges and bin counts leave the engine. Nulls
+        are ignored.
+
+        Parameters
+        ----------
+            vars (Collection[str]): Numeric variables to compare, each on its own.
+            bins (int): Number of equally populated bins of the first dataset. Fewer bins
+                are used when quantiles tie.
+
+        Returns
+        -------
+            None. Appends one `DistResults` per variable, with the population stability
+            index (PSI), Kolmogorov-Smirnov statistic and Wasserstein distance.
+
+        Examples
+        --------
+        >>> import polars as pl
+        >>> from drift_scope import DataFrameComparator
+        >>> df1 = pl.DataFrame({'price': [1.0, 2.0, 3.0, 4.0]})
+        >>> df2 = pl.DataFrame({'price': [3.0, 4.0, 5.0, 6.0]})
+        >>> comp = DataFrameComparator(df1, df2)
+        >>> comp.comp_dist(vars=('price',), bins=2)
+        >>> result = comp.results[0]
+        >>> result.data['n2'].to_pylist(), result.ks
+        ([0, 4], 0.5)
+        """
+        from drift_scope._dist import bin_edges, compare_bins, quantile_probs
+
+        with self._span("quantiles"):
+            quantiles = self._quantiles(vars, quantile_probs(bins))
+        for var in vars:
+            edges = bin_edges(quantiles[var])
+            with self._span("bin", var=var) as span:
+                counts = self._bin_counts(var, edges)
+                record_frame(span, counts)
+            self.results.append(compare_bins(var, edges, counts))
+
+    @traced
+    def comp_freq_sketch(
+        self,
+        vars: Collection[str],
+        top_k: int = 20,
+        width: int = 2**16,
+        depth: int = 4,
+        precision: int = 14,
+    ) -> None:
+        """Approximately compare frequencies of variables in fixed memory.
+
+        Each dataset is streamed once into a Count-Min sketch of key counts, a HyperLogLog
+        sketch of distinct keys and a set of heavy hitter candidates. Memory is bounded by
+        the sketch sizes and `sketch_batch_size`, not by the cardinality of `vars`.
+
+        Parameters
+        ----------
+            vars (Collection[str]): Variables to compare.
+            top_k (int): Number of top drifting keys to report.
+            width (int): Counters per Count-Min row, a power of two. Counts overestimate by
+                at most `e / width` of the rows.
+            depth (int): Count-Min rows. Bounds hold with probability `1 - e ** -depth`.
+            precision (int): HyperLogLog uses `2 ** precision` registers, for a relative
+                standard error of `1.04 / sqrt(2 ** precision)` on distinct counts.
+
+        Returns
+        -------
+            None. Appends a `SketchResults`.
+
+        Examples
+        --------
+        >>> import polars as pl
+        >>> from drift_scope import DataFrameComparator
+        >>> df1 = pl.DataFrame({'product': ['Apple', 'Banana', 'Banana']})
+        >>> df2 = pl.DataFrame({'product': ['Apple', 'Grapes', 'Grapes', 'Grapes']})
+        >>> comp = DataFrameComparator(df1, df2)
+        >>> comp.comp_freq_sketch(vars=('product',), top_k=1)
+        >>> result = comp.results[0]
+        >>> result.data['product'].to_pylist(), result.new_distinct, result.vanished_distinct
+        (['Grapes'], 1, 1)
+        """
+        from drift_scope._sketch import FreqSketch, compare_sketches
+
+        capacity = max(10 * top_k, 100)
+        sketches = []
+        for dataset, batches in enumerate(self._hashed_key_batches(vars), start=1):
+            with self._span("sketch", dataset=dataset):
+                sketch = FreqSketch(vars, width, depth, precision, capacity)
+                sketches.append(sketch.update_many(batches))
+        sketch1, sketch2 = sketches
+        self.results.append(compare_sketches(sketch1, sketch2, top_k, self.comp_freq_analysis_cols))
+
+    def _hashed_key_batches(
+        self, vars: Collection[str]
+    ) -> tuple[Iterable[pa.RecordBatch | pa.Table], Iterable[pa.RecordBatch | pa.Table]]:
+        """Stream `vars` of each dataset in batches, with a 64 bit hash of the key per row.
+
+        The hash is in the `HASH_COL` column, and must hash equal keys of both datasets
+        equally.
+        """
+        msg = f"{type(self).__name__} does not support sketched comparisons."
+        raise NotImplementedError(msg)
+
+    def _columns(self) -> tuple[Collection[str], Collection[str]]:
+        """Names of the columns of each dataset."""
+        msg = f"{type(self).__name__} does not support comparing all columns."
+        raise NotImplementedError(msg)
+
+    def _comp_freq_columns(self, cols: Collection[str]) -> None:
+        """Compare every column of `cols` on its own."""
+        for col in cols:
+            self.comp_freq((col,))
+
+    def _quantiles(
+        self, vars: Collection[str], probs: Collection[float]
+    ) -> dict[str, list[float | None]]:
+        """Quantiles at `probs` of each of `vars` in the first dataset."""
+        msg = f"{type(self).__name__} does not support distribution comparisons."
+        raise NotImplementedError(msg)
+
+    def _bin_counts(self, var: str, edges: Sequence[float]) -> Any:
+        """Rows of each dataset per `bin` of `var`, with the bounds of the values binned.
+
+        Returns `bin`, `n1`, `n2`, `min_value` and `max_value`, one row per non empty bin.
+        Bin `i` holds the values in `[edges[i - 1], edges[i])`.
+        """
+        msg = f"{type(self).__name__} does not support distribution comparisons."
+        raise NotImplementedError(msg)
+
+    def _profile_key(self) -> tuple[str, str]:
+        """Identity and fingerprint of the first dataset, to key its stored profiles."""
+        msg = f"{type(self).__name__} does not support profile stores."
+        raise NotImplementedError(msg)
+
+    def _count_dataset(self, vars: Collection[str], dataset: Any) -> nw.DataFrame[Any]:
+        """Count the rows of `dataset`, one of the compared datasets, by `vars` into `n`."""
+        msg = f"{type(self).__name__} does not support profile stores."
+        raise NotImplementedError(msg)
+
+    def _compare_to_profile(
+        self, store: ProfileStore, vars: Collection[str], df1: Any, df2: Any
+    ) -> nw.DataFrame[Any]:
+        """Compare the stored profile of `df1` to the counts of `df2`, scanning only `df2`.
+
+        `df1` is counted and its profile stored if missing or stale.
+        """
+        with self._span("fingerprint"):
+            identity, fingerprint = self._profile_key()
+        with self._span("aggregate", dataset=2) as span:
+            counts2 = self._count_dataset(vars, df2)
+            record_frame(span, counts2)
+
+        with self._span("profile") as span:
+            profile = store.load(identity, fingerprint, vars)
+            if span is not None:
+                span.attrs["hit"] = profile is not None
+        if profile is None:
+            with self._span("aggregate", dataset=1) as span:
+                counts1 = self._count_dataset(vars, df1)
+                record_frame(span, counts1)
+            store.save(identity, fingerprint, vars, counts1.to_arrow())
+        else:
+            counts1 = nw.from_arrow(profile, native_namespace=nw.get_native_namespace(counts2))
+
+        zero = nw.lit(0, dtype=nw.Int64)
+        tagged = nw.concat(
+            [
+                counts1.select(*vars, n1=nw.col("n").cast(nw.Int64), n2=zero),
+                counts2.select(*vars, n1=zero, n2=nw.col("n").cast(nw.Int64)),
+            ],
+            how="vertical",
+        )
+        return cast(
+            "nw.DataFrame[Any]",
+            with_freq_diffs(tagged.group_by(*vars).agg(nw.col("n1", "n2").sum())),
+        )
+
+    def _append_sampled_freq(self, vars: Collection[str], data: Any, sample: float) -> None:
+        """Append a comparison of sampled rows, scaled up to the full datasets."""
+        frame = nw.from_native(data)
+        estimates = with_sample_estimates(frame, sample, self.sample_confidence).select(
+            *vars, *self.comp_freq_sample_analysis_cols
+        )
+        self.results.append(
+            FreqResults(
+                vars=vars,
+                analysis_cols=self.comp_freq_sample_analysis_cols,
+                data=estimates
+                if isinstance(data, nw.DataFrame | nw.LazyFrame)
+                else estimates.to_native(),
+            )
+        )
+
+    def _append_freq(self, vars: Collection[str], data: Any) -> None:
+        """Append a frequency comparison, caching it for later roll-ups."""
+        self.freq_cache.put(vars, data)
+        self.results.append(
+            FreqResults(vars=vars, analysis_cols=self.comp_freq_analysis_cols, data=data)
+        )
+
+    def _append_cached_freq(self, vars: Collection[str]) -> bool:
+        """Append the comparison of `vars` if it can be rolled up from the cache.
+
+        The datasets are assumed to be unchanged for the lifetime of the comparator.
+        """
+        with self._span("rollup") as span:
+            data = self.freq_cache.rollup(vars, self.comp_freq_analysis_cols)
+            if span is not None:
+                span.attrs["hit"] = data is not None
+        if data is None:
+            return False
+
+        self.results.append(
+            FreqResults(vars=vars, analysis_cols=self.comp_freq_analysis_cols, data=data)
+        )
+        return True
@@ -1,55 +1,502 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import json
+from typing import TYPE_CHECKING, Literal, get_args
 
 import narwhals as nw
 
+from drift_scope._utils import (
+    KEY_COL,
+    KEY_ENCODINGS,
+    union_dimensions,
+    unique_dimension_sets,
+    validate_sample,
+    with_freq_diffs,
+)
 from drift_scope.base import BaseComparator
 from drift_scope.results import FreqResults
+from drift_scope.tracing import record_frame, traced
 
 if TYPE_CHECKING:
-    from collections.abc import Collection
+    from collections.abc import Collection, Iterable, Iterator, Sequence
+    from typing import Any
 
-    from narwhals.typing import IntoFrame
+    import polars as pl
+    import pyarrow as pa
+    from narwhals.typing import FrameT, IntoFrame
 
+    from drift_scope.profiles import ProfileStore
     from drift_scope.results import Results
 
+DATAFRAME_STRATEGIES = Literal["tagged", "join"]
+
+## Backends grouping by a native hash of the key columns, narwhals hashes no keys:
+_KEY_HASHING_BACKENDS = (nw.Implementation.POLARS, nw.Implementation.PANDAS)
+
 
 class DataFrameComparator(BaseComparator):
-    """Compare dataframes per narwals dispatch methods."""
+    """Compare dataframes per narwals dispatch methods.
+
+    Lazy inputs, i.e. polars LazyFrames or DuckDB relations, are compared lazily. Every
+    comparison is recorded as a plan and executed together on `collect` or `compile_report`.
+
+    Both dataframes are counted either by aggregating each dataframe and joining the
+    aggregates both ways to emulate a full join (`strategy="join"`, the default), or by
+    stacking them with a source indicator and grouping once (`strategy="tagged"`). The
+    join strategy only stacks the aggregates and is faster when there are few groups,
+    about 1.5x on 1k keys of 10M rows with polars. The tagged strategy hashes every key
+    once and is faster for high-cardinality dimensions, about 1.35x on 5M keys. Null keys
+    form one group with the tagged strategy, and stay unmatched across dataframes with
+    the join strategy, as in a SQL full join.
+
+    With a `profile_store`, the counts of `df1` are stored once per dimension set and
+    content hash of `df1`, later comparisons only aggregate `df2`. Dataframes have no
+    identity of their own, profiles of `df1` are stored under `profile_name`, or under
+    its schema without one, in which case a baseline replaces the profiles of any other
+    baseline of the same schema.
 
-    def __init__(self, df1: IntoFrame, df2: IntoFrame) -> None:
-        super().__init__()
+    Single threaded backends, i.e. pandas, count on a pool of `max_workers` processes when
+    it is above 1. Both dataframes are split into chunks of rows, counted by the workers
+    and merged per hash partition of the keys, see `count_freq_partitioned`. This requires
+    eager dataframes, and pays off on large inputs only, spawning the pool takes seconds.
+    Set `preload_forkserver` to fork the workers in milliseconds from the forkserver of the
+    process instead, which then preloads drift_scope and the backend for every forkserver
+    pool of the application.
+
+    With `key_encoding="hash"`, polars and pandas dataframes are counted by a 64 bit hash
+    of a multi-column key instead of the key columns, keeping the first value of each
+    column per hash, and the aggregates are joined on the hash alone. With 8 string
+    columns this counts about 3x faster on polars when keys repeat often, and still about
+    1.8x when they barely do. Distinct keys hashing equally are merged, with a probability
+    of about `keys ** 2 / 2 ** 65`. Counting on a process pool ignores the encoding.
+    """
+
+    ## Fork pool workers from the preloaded forkserver of the process instead of spawning:
+    preload_forkserver: bool = False
+
+    def __init__(
+        self,
+        df1: IntoFrame,
+        df2: IntoFrame,
+        strategy: DATAFRAME_STRATEGIES = "join",
+        profile_store: ProfileStore | None = None,
+        max_workers: int = 1,
+        key_encoding: KEY_ENCODINGS = "columns",
+        profile_name: str | None = None,
+    ) -> None:
+        super().__init__(profile_store=profile_store)
         self.df1 = nw.from_native(df1)
         self.df2 = nw.from_native(df2)
+        self.profile_name = profile_name
+        self._df1_fingerprint: str | None = None
 
         self.results: list[Results] = []
 
-    def comp_freq(self, vars: Collection[str]) -> None:  # noqa: D102
-        agg1 = self.df1.group_by(*vars).agg(n1=nw.len().cast(nw.Int64))
-        agg2 = self.df2.group_by(*vars).agg(n2=nw.len().cast(nw.Int64))
+        if strategy not in get_args(DATAFRAME_STRATEGIES):
+            msg = f"`strategy` must be one of {get_args(DATAFRAME_STRATEGIES)}, not {strategy!r}."
+            raise ValueError(msg)
+        self.strategy = strategy
+
+        if max_workers < 1:
+            msg = f"`max_workers` must be positive, not {max_workers!r}."
+            raise ValueError(msg)
+        if max_workers > 1 and (
+            isinstance(self.df1, nw.LazyFrame) or isinstance(self.df2, nw.LazyFrame)
+        ):
+            msg = "Counting on a process pool requires eager dataframes."
+            raise NotImplementedError(msg)
+        self.max_workers = max_workers
+
+        if key_encoding not in get_args(KEY_ENCODINGS):
+            msg = f"`key_encoding` must be one of {get_args(KEY_ENCODINGS)}, not {key_encoding!r}."
+            raise ValueError(msg)
+        if key_encoding == "hash" and not all(
+            df.implementation in _KEY_HASHING_BACKENDS for df in (self.df1, self.df2)
+        ):
+            msg = "Hash encoded keys are only implemented for polars and pandas dataframes."
+            raise NotImplementedError(msg)
+        self.key_encoding = key_encoding
+
+    @traced
+    def comp_freq(self, vars: Collection[str], sample: float | None = None) -> None:
+        """Compare the frequency between two dataframes among variables `vars`.
+
+        Dimension sets covered by an earlier comparison are rolled up from the cache. A
+        `sample` draws that fraction of rows from each dataframe, which requires eager
+        dataframes.
+        """
+        validate_sample(sample)
+        if sample is not None:
+            if isinstance(self.df1, nw.LazyFrame) or isinstance(self.df2, nw.LazyFrame):
+                msg = "Sampling requires eager dataframes, narwhals cannot sample lazy frames."
+                raise NotImplementedError(msg)
+            counts = self._count_freq(
+                vars, self.df1.sample(fraction=sample), self.df2.sample(fraction=sample)
+            )
+            self._append_sampled_freq(vars, with_freq_diffs(counts), sample)
+            return
+
+        if self._append_cached_freq(vars):
+            return
+
+        if self.profile_store is not None:
+            data = self._compare_to_profile(self.profile_store, vars, self.df1, self.df2)
+            self._append_freq(vars, data)
+            return
+
+        self._append_freq(vars, with_freq_diffs(self._count_freq(vars)))
+
+    @traced
+    def comp_freq_many(self, vars_many: Iterable[Collection[str]]) -> None:
+        """Compare many dimension sets from a single aggregation of each dataframe.
+
+        Both dataframes are grouped once by the union of all dimensions, every dimension
+        set is then rolled up from that aggregate. Dimension sets covered by an earlier
+        comparison are rolled up from the cache instead. With a `profile_store`, every
+        dimension set is compared to the stored profile of `df1`, as `comp_freq` does.
+        """
+        dimension_sets = unique_dimension_sets(vars_many)
+        data: dict[tuple[str, ...], Any] = {
+            vars: self.freq_cache.rollup(vars, self.comp_freq_analysis_cols)
+            for vars in dimension_sets
+        }
+
+        missing = [vars for vars in dimension_sets if data[vars] is None]
+        if self.profile_store is not None:
+            for vars in missing:
+                data[vars] = self._compare_to_profile(self.profile_store, vars, self.df1, self.df2)
+        elif len(missing) == 1:
+            data[missing[0]] = with_freq_diffs(self._count_freq(missing[0]))
+        elif missing:
+            counts = self._count_freq(union_dimensions(missing))
+            for vars in missing:
+                rolled_up = counts.group_by(*vars).agg(nw.col("n1", "n2").sum())
+                data[vars] = with_freq_diffs(rolled_up)
+
+        for vars in dimension_sets:
+            if vars in missing:
+                self._append_freq(vars, data[vars])
+            else:
+                self.results.append(
+                    FreqResults(
+                        vars=vars, analysis_cols=self.comp_freq_analysis_cols, data=data[vars]
+                    )
+                )
+
+    def _columns(self) -> tuple[Collection[str], Collection[str]]:
+        return self.df1.columns, self.df2.columns
+
+    def _quantiles(
+        self, vars: Collection[str], probs: Collection[float]
+    ) -> dict[str, list[float | None]]:
+        exprs = [
+            nw.col(var).quantile(prob, interpolation="linear").alias(f"{var}_{i}")
+            for var in vars
+            for i, prob in enumerate(probs)
+        ]
+        frame = self.df1.select(*exprs)
+        row = iter((frame.collect() if isinstance(frame, nw.LazyFrame) else frame).rows()[0])
+        return {var: [next(row) for _ in probs] for var in vars}
+
+    def _bin_counts(self, var: str, edges: Sequence[float]) -> nw.DataFrame[Any]:
+        """Bin both dataframes, stacked with indicator columns, and count them in one group by.
+
+        The bin of a value is the number of edges at or below it.
+        """
+        value = nw.col(var).cast(nw.Float64)
+        bin = (
+            nw.sum_horizontal(*((value >= edge).cast(nw.Int64) for edge in edges))
+            if edges
+            else nw.lit(0, dtype=nw.Int64)
+        )
+        one, zero = nw.lit(1, dtype=nw.Int64), nw.lit(0, dtype=nw.Int64)
+        tagged = nw.concat(
+            [
+                df.filter(~nw.col(var).is_null()).select(bin=bin, value=value, n1=n1, n2=n2)
+                for df, n1, n2 in ((self.df1, one, zero), (self.df2, zero, one))
+            ],
+            how="vertical",
+        )
+        counts = tagged.group_by("bin").agg(
+            nw.col("n1", "n2").sum(),
+            min_value=nw.col("value").min(),
+            max_value=nw.col("value").max(),
+        )
+        if isinstance(counts, nw.LazyFrame):
+            return counts.collect()
+        return counts
+
+    @traced
+    def collect(self) -> None:
+        """Execute every comparison that was recorded as a lazy plan.
+
+        Polars plans are executed together with `polars.collect_all`, so subplans shared
+        between comparisons are computed once. Other lazy backends collect each plan.
+        """
+        pending = [
+            result
+            for result in self.results
+            if isinstance(result, FreqResults) and isinstance(result.data, nw.LazyFrame)
+        ]
+        if not pending:
+            return
+
+        with self._span("execute", plans=len(pending)) as span:
+            if all(result.data.implementation is nw.Implementation.POLARS for result in pending):
+                pl = nw.get_native_namespace(pending[0].data)
+                frames = [
+                    nw.from_native(frame, eager_only=True)
+                    for frame in pl.collect_all([result.data.to_native() for result in pending])
+                ]
+            else:
+                frames = [result.data.collect() for result in pending]
+            for frame in frames:
+                record_frame(span, frame)
+
+        for result, frame in zip(pending, frames, strict=True):
+            result.data = frame
+            self.freq_cache.put(result.vars, frame)
+
+    def _profile_key(self) -> tuple[str, str]:
+        """Profiles are keyed by `profile_name` or the schema of `df1`, and a content hash.
+
+        The hash sums a stable hash of every row, so it does not depend on the order of
+        rows nor on the process computing it.
+        """
+        schema = {col: str(dtype) for col, dtype in self.df1.collect_schema().items()}
+        identity = json.dumps(["dataframe", self.profile_name or schema])
+        if self._df1_fingerprint is None:
+            import pyarrow.compute as pc
+
+            from drift_scope._sketch import stable_hashes
 
-        ## TODO: narwhals has not implemented full-join
-        left_join = agg1.join(agg2, on=list(vars), how="left")
+            rows, total = 0, 0
+            for batch in self._arrow_batches(self.df1):
+                rows += batch.num_rows
+                total += pc.sum(stable_hashes(batch)).as_py() or 0
+            self._df1_fingerprint = json.dumps([rows, total % 2**64])
+        return identity, self._df1_fingerprint
+
+    def _count_dataset(self, vars: Collection[str], dataset: Any) -> nw.DataFrame[Any]:
+        counts = dataset.group_by(*vars).agg(n=nw.len().cast(nw.Int64))
+        if isinstance(counts, nw.LazyFrame):
+            return counts.collect()
+        return counts  # type: ignore[no-any-return]
+
+    def _hashed_key_batches(
+        self, vars: Collection[str]
+    ) -> tuple[Iterable[pa.RecordBatch | pa.Table], Iterable[pa.RecordBatch | pa.Table]]:
+        """Stream the keys of each dataframe as arrow batches with a hash per row.
+
+        Polars hashes the keys natively, other backends hash every batch with arrow kernels.
+        Polars LazyFrames are streamed, other lazy frames are collected first.
+        """
+        return self._hash_batches(self.df1, vars), self._hash_batches(self.df2, vars)
+
+    def _hash_batches(
+        self, frame: nw.DataFrame[Any] | nw.LazyFrame[Any], vars: Collection[str]
+    ) -> Iterable[pa.RecordBatch | pa.Table]:
+        from drift_scope._sketch import HASH_COL, stable_hashes
+
+        keys = frame.select(*vars)
+        if keys.implementation is nw.Implementation.POLARS:
+            pl = nw.get_native_namespace(keys)
+            hash_expr = pl.struct(*vars).hash(0).alias(HASH_COL)
+            native = keys.to_native()
+            if isinstance(native, pl.LazyFrame):
+                yield from _collect_batches(native.with_columns(hash_expr), self.sketch_batch_size)
+                return
+            for chunk in native.iter_slices(self.sketch_batch_size):
+                yield chunk.with_columns(hash_expr).to_arrow()
+            return
+
+        for batch in self._arrow_batches(keys):
+            yield batch.append_column(HASH_COL, stable_hashes(batch))
+
+    def _arrow_batches(
+        self, frame: nw.DataFrame[Any] | nw.LazyFrame[Any]
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream `frame` as arrow batches of at most `sketch_batch_size` rows.
+
+        Polars LazyFrames are streamed, other lazy frames are collected first.
+        """
+        if isinstance(frame, nw.LazyFrame):
+            if frame.implementation is nw.Implementation.POLARS:
+                yield from _collect_batches(frame.to_native(), self.sketch_batch_size)
+                return
+            frame = frame.collect()
+        yield from frame.to_arrow().to_batches(max_chunksize=self.sketch_batch_size)
+
+    def _count_freq(
+        self,
+        vars: Collection[str],
+        df1: nw.DataFrame[Any] | None = None,
+        df2: nw.DataFrame[Any] | None = None,
+    ) -> nw.DataFrame[Any] | nw.LazyFrame[Any]:
+        """Count both dataframes, or samples of them, by `vars` into one frame of `n1` and `n2`."""
+        df1 = self.df1 if df1 is None else df1
+        df2 = self.df2 if df2 is None else df2
+        counts: nw.DataFrame[Any] | nw.LazyFrame[Any]
+        with self._span("aggregate", strategy=self.strategy) as span:
+            if self.max_workers > 1:
+                from drift_scope._parallel import count_freq_partitioned
+
+                counts = count_freq_partitioned(
+                    df1,
+                    df2,
+                    vars,
+                    self.strategy,
+                    self.max_workers,
+                    preload=self.preload_forkserver,
+                )
+            elif self.strategy == "join":
+                counts = self._count_freq_join(vars, df1, df2)
+            else:
+                counts = self._count_freq_tagged(vars, df1, df2)
+            record_frame(span, counts)
+        return counts
+
+    def _count_freq_tagged(
+        self, vars: Collection[str], df1: nw.DataFrame[Any], df2: nw.DataFrame[Any]
+    ) -> nw.DataFrame[Any] | nw.LazyFrame[Any]:
+        """Stack both dataframes with indicator columns and count them in one group by.
+
+        Each row carries a 1 in the indicator of its source, so `n1` and `n2` are plain sums
+        and every key is hashed once, without joining.
+        """
+        one, zero = nw.lit(1, dtype=nw.Int64), nw.lit(0, dtype=nw.Int64)
+        tagged = nw.concat(
+            [
+                df1.select(*vars).with_columns(n1=one, n2=zero),
+                df2.select(*vars).with_columns(n1=zero, n2=one),
+            ],
+            how="vertical",
+        )
+        counts: nw.DataFrame[Any] | nw.LazyFrame[Any]
+        if self._encodes_keys(vars):
+            counts = self._sum_by_key(tagged, vars, ("n1", "n2")).drop(KEY_COL)
+        else:
+            counts = tagged.group_by(*vars).agg(nw.col("n1", "n2").sum())
+        return counts.with_columns(nw.col("n1", "n2").cast(nw.Int64))
+
+    def _count_freq_join(
+        self, vars: Collection[str], df1: nw.DataFrame[Any], df2: nw.DataFrame[Any]
+    ) -> nw.DataFrame[Any] | nw.LazyFrame[Any]:
+        """Aggregate each dataframe, then join the aggregates both ways as a full join."""
+        if self._encodes_keys(vars):
+            return self._count_freq_join_by_key(vars, df1, df2)
+
+        agg1 = df1.group_by(*vars).agg(n1=nw.len())
+        agg2 = df2.group_by(*vars).agg(n2=nw.len())
+        return join_counts(vars, agg1, agg2)
+
+    def _count_freq_join_by_key(
+        self, vars: Collection[str], df1: nw.DataFrame[Any], df2: nw.DataFrame[Any]
+    ) -> nw.DataFrame[Any] | nw.LazyFrame[Any]:
+        """Aggregate each dataframe by the hash of `vars`, then join the aggregates on it.
+
+        Key columns are taken from whichever aggregate holds the key.
+        """
+        one = nw.lit(1, dtype=nw.Int64)
+        agg1 = self._sum_by_key(df1.select(*vars).with_columns(n1=one), vars, ("n1",))
+        agg2 = self._sum_by_key(df2.select(*vars).with_columns(n2=one), vars, ("n2",))
+
+        left_join = agg1.join(agg2.select(KEY_COL, "n2"), on=KEY_COL, how="left")
         right_only = (
-            agg2.join(agg1, on=list(vars), how="left")
+            agg2.join(agg1.select(KEY_COL, "n1"), on=KEY_COL, how="left")
             .filter(nw.col("n1").is_null())
-            .select(*vars, "n1", "n2")  # need to rearrange columns to vstack
+            .select(KEY_COL, *vars, "n1", "n2")
         )
 
-        concatted = (
+        counts: nw.DataFrame[Any] | nw.LazyFrame[Any] = (
             nw.concat([left_join, right_only], how="vertical")
-            .with_columns(nw.col("n1", "n2").fill_null(0))
-            .with_columns(real_diff=nw.col("n2") - nw.col("n1"))
-            .with_columns(
-                abs_diff=nw.col("real_diff").abs(),
-                pct_diff=((nw.col("n2") - nw.col("n1")) * 100)
-                / (nw.col("n1") + nw.col("n2"))
-                / 100,
-            )
-            .with_columns(abs_pct_diff=nw.col("pct_diff").abs())
+            .drop(KEY_COL)
+            .with_columns(nw.col("n1", "n2").fill_null(0).cast(nw.Int64))
         )
+        return counts
+
+    def _encodes_keys(self, vars: Collection[str]) -> bool:
+        """Whether `vars` are counted by their hash, single columns never are."""
+        return self.key_encoding == "hash" and len(vars) > 1
+
+    def _sum_by_key(self, frame: FrameT, vars: Collection[str], sums: Sequence[str]) -> FrameT:
+        """Sum `sums` of `frame` by the hash of `vars` in `KEY_COL`, with the first value of `vars`.
+
+        Grouped natively, narwhals neither hashes keys nor takes first values.
+        """
+        native = frame.to_native()
+        if frame.implementation is nw.Implementation.POLARS:
+            pl = nw.get_native_namespace(frame)
+            summed = native.group_by(pl.struct(*vars).hash(0).alias(KEY_COL)).agg(
+                pl.col(*vars).first(), pl.col(*sums).sum()
+            )
+        else:
+            pd = nw.get_native_namespace(frame)
+            keyed = native.assign(
+                **{KEY_COL: pd.util.hash_pandas_object(native[list(vars)], index=False)}
+            )
+            summed = (
+                keyed.groupby(KEY_COL, sort=False)
+                .agg(dict.fromkeys(vars, "first") | dict.fromkeys(sums, "sum"))
+                .reset_index()
+            )
+        return nw.from_native(summed)  # type: ignore[return-value]
+
 
-        res = FreqResults(vars=vars, analysis_cols=self.comp_freq_analysis_cols, data=concatted)
+def join_counts(
+    vars: Collection[str], agg1: nw.DataFrame[Any], agg2: nw.DataFrame[Any]
+) -> nw.DataFrame[Any]:
+    """Join the counts `n1` of one dataframe and `n2` of the other both ways, as a full join.
 
-        self.results.append(res)
+    Null keys match as they do in joins of the backend.
+    """
+    ## TODO: narwhals has not implemented full-join
+    left_join = agg1.join(agg2, on=list(vars), how="left")
+    right_only = (
+        agg2.join(agg1, on=list(vars), how="left")
+        .filter(nw.col("n1").is_null())
+        .select(*vars, "n1", "n2")  # need to rearrange columns to vstack
+    )
+
+    counts: nw.DataFrame[Any] = nw.concat([left_join, right_only], how="vertical")
+    return counts.with_columns(nw.col("n1", "n2").fill_null(0).cast(nw.Int64))
+
+
+def _collect_batches(frame: pl.LazyFrame, batch_size: int) -> Iterator[pa.RecordBatch]:
+    """Stream a polars LazyFrame as arrow batches of at most `batch_size` rows.
+
+    Polars versions without `collect_batches` sink the frame to a temporary arrow file
+    instead, read back memory mapped, so the frame is never held in memory as a whole.
+    """
+    if hasattr(frame, "collect_batches"):
+        for chunk in frame.collect_batches(chunk_size=batch_size):
+            yield from chunk.to_arrow().to_batches(max_chunksize=batch_size)
+        return
+
+    import tempfile
+    import warnings
+    from pathlib import Path
+
+    import pyarrow as pa
+
+    with tempfile.TemporaryDirectory(prefix="drift_scope_") as tmp:
+        path = Path(tmp) / "frame.arrow"
+        with warnings.catch_warnings():
+            ## Sinking runs on the streaming engine these versions deprecate:
+            warnings.simplefilter("ignore", DeprecationWarning)
+            frame.sink_ipc(path, compression=None)
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            ## Arrow kernels do not support the view types polars writes:
+            schema = pa.schema(
+                field.with_type(pa.large_string())
+                if pa.types.is_string_view(field.type)
+                else field.with_type(pa.large_binary())
+                if pa.types.is_binary_view(field.type)
+                else field
+                for field in reader.schema
+            )
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).cast(schema)
+                for start in range(0, batch.num_rows, batch_size):
+                    yield batch.slice(start, batch_size)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pyarrow.parquet as pq
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+
+    import pyarrow as pa
+
+_FINGERPRINT_KEY = b"drift_scope.fingerprint"
+
+
+class ProfileStore:
+    """Frequency profiles of datasets, persisted as parquet files in a local directory.
+
+    A profile holds the row count `n` of every key of a dimension set in one dataset. It is
+    keyed by the identity of the dataset and the dimension set, and remembers the
+    fingerprint the dataset had when profiled. Loading it with any other fingerprint
+    deletes it, so profiles of changed datasets are never served.
+
+    Examples
+    --------
+    >>> import polars as pl, tempfile
+    >>> from drift_scope import DataFrameComparator, ProfileStore
+    >>> store = ProfileStore(tempfile.mkdtemp())
+    >>> baseline = pl.DataFrame({'product': ['Apple', 'Banana']})
+    >>> for snapshot in ([['Apple']], [['Banana', 'Grapes']]):
+    ...     comp = DataFrameComparator(baseline, pl.DataFrame(snapshot, schema=['product']),
+    ...                                profile_store=store)
+    ...     comp.comp_freq(vars=('product',))  # aggregates the baseline only once
+    >>> len(store)
+    1
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.path.glob("*.parquet"))
+
+    def _file(self, identity: str, vars: Collection[str]) -> Path:
+        key = json.dumps([identity, sorted(vars)]).encode()
+        return self.path / f"{hashlib.sha256(key).hexdigest()}.parquet"
+
+    def load(self, identity: str, fingerprint: str, vars: Collection[str]) -> pa.Table | None:
+        """The profile of `vars` in the dataset `identity`, unless missing or stale."""
+        file = self._file(identity, vars)
+        try:
+            stored = pq.read_schema(file).metadata or {}
+        except FileNotFoundError:
+            return None
+
+        if stored.get(_FINGERPRINT_KEY) != fingerprint.encode():
+            file.unlink(missing_ok=True)
+            return None
+        return pq.read_table(file, columns=[*vars, "n"])
+
+    def save(
+        self, identity: str, fingerprint: str, vars: Collection[str], counts: pa.Table
+    ) -> None:
+        """Persist the profile `counts`, of `vars` and `n`, replacing any older profile.
+
+        The file is written aside and moved into place, so readers never see a partial file.
+        """
+        file = self._file(identity, vars)
+        metadata = (counts.schema.metadata or {}) | {_FINGERPRINT_KEY: fingerprint.encode()}
+        counts = counts.select([*vars, "n"]).replace_schema_metadata(metadata)
+
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(counts, tmp)
+            Path(tmp).replace(file)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Delete every profile."""
+        for file in self.path.glob("*.parquet"):
+            file.unlink(missing_ok=True)
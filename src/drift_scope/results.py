@@ -6,29 +6,77 @@ from typing import TYPE_CHECKING, Generic
 
 import narwhals as nw
 from narwhals.typing import IntoFrameT
-from rich.console import Console
-from rich.table import Table
 
-from drift_scope._utils import extract_rows
+from drift_scope._rows import CHANGES
+from drift_scope._utils import extract_rows, pages, top_rows
 
 if TYPE_CHECKING:
-    from collections.abc import Collection
+    from collections.abc import Collection, Iterable, Sequence
+    from typing import Any
+
+    import pyarrow as pa
+    from rich.table import Table
+
+    from drift_scope.tracing import Span
 
 
 class Results(ABC):
     """Results base class."""
 
+    ## Span of the operation that appended the results, when its comparator was traced:
+    trace: Span | None = None
+
     @abstractmethod
     def __init__(self) -> None:
         self.name: str
 
     @abstractmethod
-    def report_as_table(self, *, abs_pct_diff_threshold: float = 0) -> None:
-        """Report findings by printing a markdown table."""
+    def report_as_table(
+        self,
+        abs_pct_diff_threshold: float = 0,
+        *,
+        top_n: int | None = None,
+        sort_by: str | None = None,
+        descending: bool = True,
+        page_size: int | None = None,
+    ) -> None:
+        """Report findings by printing console tables.
+
+        Rows are filtered by `abs_pct_diff_threshold`, ordered by `sort_by` and limited to
+        `top_n` in the engine holding the results, then printed in tables of at most
+        `page_size` rows, one page at a time.
+        """
+
+    @abstractmethod
+    def summarize(self, abs_pct_diff_threshold: float = 0) -> dict[str, str]:
+        """Headline measures of the findings, aggregated in the engine holding the results."""
+
+    def collect(self) -> None:  # noqa: B027
+        """Execute any deferred computation of the results, a no-op by default."""
+
+
+class _FrameResults(Results, Generic[IntoFrameT]):
+    """Results holding a frame, which comparators of lazy inputs record as a plan."""
+
+    data: IntoFrameT
+
+    @property
+    def is_lazy(self) -> bool:
+        """Whether `data` is still a deferred plan."""
+        return isinstance(nw.from_native(self.data), nw.LazyFrame)
+
+    def collect(self) -> None:
+        """Execute the plan of lazy `data` in place, keeping its narwhals or native form."""
+        lazy = nw.from_native(self.data)
+        if not isinstance(lazy, nw.LazyFrame):
+            return
+
+        frame = lazy.collect()
+        self.data = frame if isinstance(self.data, nw.LazyFrame) else frame.to_native()
 
 
 @dataclass
-class FreqResults(Results, Generic[IntoFrameT]):
+class FreqResults(_FrameResults[IntoFrameT]):
     """Frequency results."""
 
     vars: Collection[str]
@@ -43,38 +91,495 @@ class FreqResults(Results, Generic[IntoFrameT]):
             .to_native()
         )
 
-    def report_as_table(self, abs_pct_diff_threshold: float = 0) -> None:
-        """Report the findings as a console printed table.
+    def report_as_table(
+        self,
+        abs_pct_diff_threshold: float = 0,
+        *,
+        top_n: int | None = None,
+        sort_by: str | None = None,
+        descending: bool = True,
+        page_size: int | None = None,
+    ) -> None:
+        """Report the findings as console printed tables.
+
+        With `top_n`, lazy results are not collected, only their top rows are. Rendering
+        then costs the same however many keys were compared.
 
         Args:
-            abs_pct_diff_threshold (float, optional): The threshold to display absolute
-            percent differences as red, symbolizing a problem. Defaults to 0.
+            abs_pct_diff_threshold (float, optional): Only keys drifting by at least this
+            absolute percent difference are listed. Defaults to 0.
+            top_n (int, optional): Only list this many keys, the most drifting unless
+            `sort_by` is given. Defaults to all.
+            sort_by (str, optional): Column to order the keys by. Defaults to the order of
+            the results, or `abs_pct_diff` with `top_n`.
+            descending (bool, optional): Order `sort_by` descending. Defaults to True.
+            page_size (int, optional): Print a table per this many keys. Defaults to one
+            table.
         """
-        filtered_data = self._filter_freq_threshold(abs_pct_diff_threshold)
+        if top_n is None:
+            self.collect()
+        if sort_by is None and top_n is not None:
+            sort_by = "abs_pct_diff"
+        filtered_data = nw.from_native(self._filter_freq_threshold(abs_pct_diff_threshold))
+        data = top_rows(filtered_data, sort_by=sort_by, descending=descending, top_n=top_n)
 
-        tab_title: str = f"Dimensions: {self.vars!s}"
-        table = Table(title=tab_title, title_justify="left")
+        ## Condionally format rows:
+        index_of_abs_pct_diff = len(self.vars) + list(self.analysis_cols).index("abs_pct_diff")
 
-        for var in self.vars:
-            table.add_column(style="magenta", header=var.title(), no_wrap=True)
+        from rich.console import Console
+        from rich.table import Table
 
-        for var in self.analysis_cols:
-            table.add_column(header=var.title(), no_wrap=True, justify="right")
+        console = Console()
+        for page in pages(data, page_size):
+            tab_title: str = f"Dimensions: {self.vars!s}"
+            table = Table(title=tab_title, title_justify="left")
 
-        ## Condionally format rows:
-        index_of_abs_pct_diff = len(self.vars) + list(self.analysis_cols).index("abs_pct_diff")
+            for var in self.vars:
+                table.add_column(style="magenta", header=var.title(), no_wrap=True)
+
+            for var in self.analysis_cols:
+                table.add_column(header=var.title(), no_wrap=True, justify="right")
+
+            for row in extract_rows(page):
+                abs_pct_diff = row[index_of_abs_pct_diff]
+                if abs(abs_pct_diff) == 0:
+                    style = "green"
+                elif abs(abs_pct_diff) < 0.25:
+                    style = "yellow"
+                else:
+                    style = "red"
+
+                row_clean = tuple(str(elem) for elem in row)
+                table.add_row(*row_clean, style=style)
+
+            console.print(table)
+
+    def summarize(self, abs_pct_diff_threshold: float = 0) -> dict[str, str]:
+        """Count the keys, those drifting by at least the threshold, and the largest drift."""
+        keys, drifting, max_drift = _drift_stats(
+            nw.from_native(self.data), nw.col("pct_diff").abs(), abs_pct_diff_threshold
+        )
+        return {
+            "Dimensions": str(self.vars),
+            "Keys": str(keys),
+            "Drifting Keys": str(drifting),
+            "Max Abs Pct Diff": "-" if max_drift is None else f"{max_drift:.2%}",
+        }
+
+
+@dataclass
+class SketchResults(Results):
+    """Approximate frequency results, estimated from bounded memory sketches.
+
+    `data` holds the keys drifting the most, with estimated counts. Each count overcounts
+    by at most `count_error1` (`count_error2`) with probability `confidence`, distinct
+    counts have a standard error of `distinct_error`.
+    """
+
+    vars: Collection[str]
+    analysis_cols: Collection[str]
+    data: pa.Table
+    total1: int
+    total2: int
+    distinct1: int
+    distinct2: int
+    new_distinct: int
+    vanished_distinct: int
+    distinct_error: int
+    count_error1: int
+    count_error2: int
+    confidence: float
+    name: str = "Sketched Frequency Results"
+
+    def report_as_table(
+        self,
+        abs_pct_diff_threshold: float = 0,
+        *,
+        top_n: int | None = None,
+        sort_by: str | None = None,
+        descending: bool = True,
+        page_size: int | None = None,
+    ) -> None:
+        """Report the cardinality summary and the top drifting keys as console tables.
+
+        Args:
+            abs_pct_diff_threshold (float, optional): Only keys drifting by at least this
+            absolute percent difference are listed. Defaults to 0.
+            top_n (int, optional): Only list this many of the top drifting keys.
+            sort_by (str, optional): Column to order the keys by. Defaults to their drift.
+            descending (bool, optional): Order `sort_by` descending. Defaults to True.
+            page_size (int, optional): Print a table per this many keys.
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        console = Console()
+
+        summary = Table(title=f"Dimensions: {self.vars!s}", title_justify="left")
+        for header in ("Measure", "Dataset 1", "Dataset 2", "Error"):
+            summary.add_column(header=header, no_wrap=True, justify="right")
+        summary.add_row("Rows", str(self.total1), str(self.total2), "exact")
+        summary.add_row(
+            "Distinct Keys", str(self.distinct1), str(self.distinct2), f"± {self.distinct_error}"
+        )
+        summary.add_row(
+            "Vanished Keys", str(self.vanished_distinct), "", f"± {self.distinct_error}"
+        )
+        summary.add_row("New Keys", "", str(self.new_distinct), f"± {self.distinct_error}")
+        summary.add_row(
+            "Key Count Overestimate",
+            f"≤ {self.count_error1}",
+            f"≤ {self.count_error2}",
+            f"{self.confidence:.1%} confidence",
+        )
+        console.print(summary)
+
+        data = nw.from_native(self.data, eager_only=True).filter(
+            nw.col("abs_pct_diff") >= nw.lit(abs_pct_diff_threshold)
+        )
+        data = top_rows(
+            data.select(*self.vars, *self.analysis_cols),
+            sort_by=sort_by,
+            descending=descending,
+            top_n=top_n,
+        )
+        for page in pages(data, page_size):
+            table = Table(title="Top Drifting Keys", title_justify="left")
+            for var in self.vars:
+                table.add_column(style="magenta", header=var.title(), no_wrap=True)
+            for var in self.analysis_cols:
+                table.add_column(header=var.title(), no_wrap=True, justify="right")
+            for row in page.iter_rows(named=False):
+                table.add_row(*(str(elem) for elem in row))
+            console.print(table)
+
+    def summarize(self, abs_pct_diff_threshold: float = 0) -> dict[str, str]:
+        """Row and distinct key counts of both datasets, with the new and vanished keys."""
+        return {
+            "Dimensions": str(self.vars),
+            "Rows": f"{self.total1} / {self.total2}",
+            "Distinct Keys": f"{self.distinct1} / {self.distinct2} ± {self.distinct_error}",
+            "New Keys": str(self.new_distinct),
+            "Vanished Keys": str(self.vanished_distinct),
+        }
+
+
+@dataclass
+class DistResults(Results):
+    """Numeric distribution results, from bin counts over quantile edges of the baseline.
+
+    Bin `i` holds the values in `[lower, upper)`. `ks` and `wasserstein` are estimated from
+    the binned distributions, assuming values spread uniformly within each bin.
+    """
+
+    var: str
+    data: pa.Table
+    psi: float
+    ks: float
+    wasserstein: float
+    name: str = "Numeric Distribution Results"
+
+    def report_as_table(
+        self,
+        abs_pct_diff_threshold: float = 0,
+        *,
+        top_n: int | None = None,
+        sort_by: str | None = None,
+        descending: bool = True,
+        page_size: int | None = None,
+    ) -> None:
+        """Report the drift statistics and the binned distributions as console tables.
+
+        Args:
+            abs_pct_diff_threshold, top_n, sort_by, descending, page_size: Unused, the few
+            bins are always listed in order.
+        """
+        from rich.console import Console
+        from rich.table import Table
+
+        console = Console()
+
+        ## Conventional PSI cut-offs, small below 0.1 and major from 0.25:
+        if self.psi < 0.1:
+            style = "green"
+        elif self.psi < 0.25:
+            style = "yellow"
+        else:
+            style = "red"
+        summary = Table(title=f"Variable: {self.var}", title_justify="left")
+        for header in ("PSI", "KS", "Wasserstein"):
+            summary.add_column(header=header, no_wrap=True, justify="right")
+        summary.add_row(f"{self.psi:.4f}", f"{self.ks:.4f}", f"{self.wasserstein:.4g}", style=style)
+        console.print(summary)
+
+        table = Table(title="Bins", title_justify="left")
+        for col in self.data.column_names:
+            table.add_column(header=col.title(), no_wrap=True, justify="right")
+        for row in nw.from_native(self.data, eager_only=True).iter_rows(named=False):
+            table.add_row(*(str(elem) for elem in row))
+        console.print(table)
+
+    def summarize(self, abs_pct_diff_threshold: float = 0) -> dict[str, str]:
+        """The drift statistics of the variable."""
+        return {
+            "Variable": self.var,
+            "PSI": f"{self.psi:.4f}",
+            "KS": f"{self.ks:.4f}",
+            "Wasserstein": f"{self.wasserstein:.4g}",
+        }
+
+
+@dataclass
+class SnapshotResults(_FrameResults[IntoFrameT]):
+    """Frequency results of one baseline against many target snapshots.
+
+    `data` holds the keys, the baseline count `n_base`, and per target `i` the count `n_i`,
+    `real_diff_i` and `pct_diff_i` against the baseline. `max_abs_pct_diff` is the largest
+    absolute percent difference of any target.
+    """
+
+    vars: Collection[str]
+    labels: Sequence[str]
+    data: IntoFrameT
+    name: str = "Snapshot Frequency Results"
+
+    def report_as_table(
+        self,
+        abs_pct_diff_threshold: float = 0,
+        *,
+        top_n: int | None = None,
+        sort_by: str | None = None,
+        descending: bool = True,
+        page_size: int | None = None,
+    ) -> None:
+        """Report the drift trajectory of each key as console printed tables.
+
+        Keys are sorted by their largest drift. Each target shows its count and percent
+        difference against the baseline, the trend plots the percent differences in order.
+
+        Args:
+            abs_pct_diff_threshold (float, optional): Only keys drifting by at least this
+            absolute percent difference in any target are listed. Defaults to 0.
+            top_n (int, optional): Only list this many keys, lazy results only collect
+            those. Defaults to all.
+            sort_by (str, optional): Column to order the keys by. Defaults to
+            `max_abs_pct_diff`.
+            descending (bool, optional): Order `sort_by` descending. Defaults to True.
+            page_size (int, optional): Print a table per this many keys. Defaults to one
+            table.
+        """
+        if top_n is None:
+            self.collect()
+        filtered = nw.from_native(self.data).filter(
+            nw.col("max_abs_pct_diff") >= nw.lit(abs_pct_diff_threshold)
+        )
+        data = top_rows(
+            filtered, sort_by=sort_by or "max_abs_pct_diff", descending=descending, top_n=top_n
+        )
+
+        from rich.console import Console
+        from rich.table import Table
+
+        console = Console()
+        targets = range(1, len(self.labels) + 1)
+        for page in pages(data, page_size):
+            table = Table(title=f"Dimensions: {self.vars!s}", title_justify="left")
+            for var in self.vars:
+                table.add_column(style="magenta", header=var.title(), no_wrap=True)
+            table.add_column(header="Baseline", no_wrap=True, justify="right")
+            for label in self.labels:
+                table.add_column(header=label, no_wrap=True, justify="right")
+            table.add_column(header="Trend", no_wrap=True)
+            self._add_rows(table, page, targets)
+            console.print(table)
 
-        for row in extract_rows(filtered_data):
-            abs_pct_diff = row[index_of_abs_pct_diff]
-            if abs(abs_pct_diff) == 0:
+    def _add_rows(self, table: Table, page: nw.DataFrame[Any], targets: range) -> None:
+        for row in page.iter_rows(named=True):
+            max_abs_pct_diff = row["max_abs_pct_diff"]
+            if max_abs_pct_diff == 0:
                 style = "green"
-            elif abs(abs_pct_diff) < 0.25:
+            elif max_abs_pct_diff < 0.25:
                 style = "yellow"
             else:
                 style = "red"
 
-            row_clean = tuple(str(elem) for elem in row)
-            table.add_row(*row_clean, style=style)
+            pct_diffs = [row[f"pct_diff_{i}"] for i in targets]
+            table.add_row(
+                *(str(row[var]) for var in self.vars),
+                str(row["n_base"]),
+                *(f"{row[f'n_{i}']} ({row[f'pct_diff_{i}']:+.0%})" for i in targets),
+                _sparkline(pct_diffs),
+                style=style,
+            )
+
+    def summarize(self, abs_pct_diff_threshold: float = 0) -> dict[str, str]:
+        """Count the keys, those drifting by at least the threshold, and the largest drift."""
+        keys, drifting, max_drift = _drift_stats(
+            nw.from_native(self.data), nw.col("max_abs_pct_diff"), abs_pct_diff_threshold
+        )
+        return {
+            "Dimensions": str(self.vars),
+            "Targets": str(len(self.labels)),
+            "Keys": str(keys),
+            "Drifting Keys": str(drifting),
+            "Max Abs Pct Diff": "-" if max_drift is None else f"{max_drift:.2%}",
+        }
+
+
+@dataclass
+class RowDiffResults(Results):
+    """Keyed row differences, found by bisecting key ranges with mismatching checksums.
+
+    `data` holds the key columns and the `change` of every key, `inserted` into or
+    `deleted` from the second table, or `updated` in any of the compared `cols`.
+    `segments_compared` key ranges were checksummed, and `rows_fetched` rows read out of
+    the engine to classify the changes.
+    """
+
+    keys: Sequence[str]
+    cols: Sequence[str]
+    data: pa.Table
+    segments_compared: int
+    rows_fetched: int
+    name: str = "Keyed Row Differences"
+
+    def _changed(self, change: str) -> list[tuple[Any, ...]]:
+        data = nw.from_native(self.data, eager_only=True)
+        return data.filter(nw.col("change") == change).select(*self.keys).rows()
+
+    @property
+    def inserted(self) -> list[tuple[Any, ...]]:
+        """Keys only in the second table."""
+        return self._changed("inserted")
+
+    @property
+    def deleted(self) -> list[tuple[Any, ...]]:
+        """Keys only in the first table."""
+        return self._changed("deleted")
+
+    @property
+    def updated(self) -> list[tuple[Any, ...]]:
+        """Keys in both tables, with different values."""
+        return self._changed("updated")
+
+    def report_as_table(
+        self,
+        abs_pct_diff_threshold: float = 0,
+        *,
+        top_n: int | None = None,
+        sort_by: str | None = None,
+        descending: bool = True,
+        page_size: int | None = None,
+    ) -> None:
+        """Report the number of changes and the changed keys as console tables.
+
+        Args:
+            abs_pct_diff_threshold (float, optional): Unused, changes have no drift.
+            top_n (int, optional): Only list this many changed keys. Defaults to all.
+            sort_by (str, optional): Column to order the changed keys by.
+            descending (bool, optional): Order `sort_by` descending. Defaults to True.
+            page_size (int, optional): Print a table per this many changed keys.
+        """
+        from rich.console import Console
+        from rich.table import Table
 
         console = Console()
+
+        summary = Table(title=f"Keys: {tuple(self.keys)!s}", title_justify="left")
+        for header in (*(change.title() for change in CHANGES), "Segments", "Rows Fetched"):
+            summary.add_column(header=header, no_wrap=True, justify="right")
+        summary.add_row(*list(self.summarize().values())[1:])
+        console.print(summary)
+
+        styles = {"inserted": "green", "deleted": "red", "updated": "yellow"}
+        data = top_rows(
+            nw.from_native(self.data, eager_only=True),
+            sort_by=sort_by,
+            descending=descending,
+            top_n=top_n,
+        )
+        for page in pages(data, page_size):
+            table = Table(title="Changed Keys", title_justify="left")
+            for key in self.keys:
+                table.add_column(style="magenta", header=key.title(), no_wrap=True)
+            table.add_column(header="Change", no_wrap=True)
+            for row in page.iter_rows(named=True):
+                table.add_row(
+                    *(str(row[key]) for key in self.keys),
+                    row["change"],
+                    style=styles[row["change"]],
+                )
+            console.print(table)
+
+    def summarize(self, abs_pct_diff_threshold: float = 0) -> dict[str, str]:
+        """Count the changes of every kind, and the work the bisection took."""
+        counts = dict(
+            nw.from_native(self.data, eager_only=True).group_by("change").agg(nw.len()).rows()
+        )
+        return {
+            "Keys": str(tuple(self.keys)),
+            **{change.title(): str(counts.get(change, 0)) for change in CHANGES},
+            "Segments": str(self.segments_compared),
+            "Rows Fetched": str(self.rows_fetched),
+        }
+
+
+def print_reports(
+    results: Iterable[Results],
+    abs_pct_diff_threshold: float = 0,
+    *,
+    top_n: int | None = None,
+    sort_by: str | None = None,
+    descending: bool = True,
+    summary_only: bool = False,
+    page_size: int | None = None,
+) -> None:
+    """Print every result under a rule, in full or as a one row summary."""
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    for result in results:
+        console.rule(result.name)
+        if not summary_only:
+            result.report_as_table(
+                abs_pct_diff_threshold,
+                top_n=top_n,
+                sort_by=sort_by,
+                descending=descending,
+                page_size=page_size,
+            )
+            continue
+
+        summary = result.summarize(abs_pct_diff_threshold)
+        table = Table(title="Summary", title_justify="left")
+        for header in summary:
+            table.add_column(header=header, no_wrap=True)
+        table.add_row(*summary.values())
         console.print(table)
+
+
+def _drift_stats(
+    data: nw.DataFrame[Any] | nw.LazyFrame[Any], drift: nw.Expr, threshold: float
+) -> tuple[int, int, float | None]:
+    """Keys, keys drifting by at least `threshold`, and the largest `drift`, in one pass."""
+    stats = data.select(
+        keys=nw.len(),
+        drifting=(drift >= nw.lit(threshold)).cast(nw.Int64).sum(),
+        max_drift=drift.max(),
+    )
+    keys, drifting, max_drift = (
+        stats.collect() if isinstance(stats, nw.LazyFrame) else stats
+    ).rows()[0]
+    return keys, drifting or 0, max_drift
+
+
+## Percent differences span [-1, 1], plotted over eight levels:
+_SPARK_LEVELS = "▁▂▃▄▅▆▇█"
+
+
+def _sparkline(pct_diffs: Sequence[float]) -> str:
+    return "".join(
+        _SPARK_LEVELS[min(int((pct_diff + 1) / 2 * len(_SPARK_LEVELS)), len(_SPARK_LEVELS) - 1)]
+        for pct_diff in pct_diffs
+    )
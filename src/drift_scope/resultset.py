@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, get_args
+
+import narwhals as nw
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from drift_scope._utils import stringify_container, union_dimensions
+from drift_scope.results import FreqResults
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import Iterable, Iterator
+    from typing import Any
+
+    from drift_scope.results import Results
+
+EXPORT_FORMATS = Literal["ipc", "feather", "parquet"]
+
+_RESULTS_KEY = b"drift_scope.results"
+
+_SUFFIXES: dict[str, EXPORT_FORMATS] = {
+    ".arrow": "ipc",
+    ".ipc": "ipc",
+    ".feather": "feather",
+    ".parquet": "parquet",
+}
+
+
+class ResultSet:
+    """Frequency results of many comparisons, stacked into one long format arrow table.
+
+    `table` holds a `dimensions` column naming the dimension set of every row, the union
+    of all dimensions as key columns, null outside of their dimension set, and the
+    analysis columns. Results are stacked as chunks of their arrow data, so results
+    already held by arrow are neither copied on stacking nor on export. Only columns
+    typed differently across results, i.e. the float counts of sampled comparisons, are
+    cast to a common type.
+
+    Exported IPC and Feather files are read back memory mapped, without copying or
+    allocating, so large result sets open instantly. The dimension sets and analysis
+    columns of every result are kept in the schema metadata, splitting the table back
+    into `results` by zero copy slices.
+
+    Examples
+    --------
+    >>> import polars as pl, tempfile
+    >>> from drift_scope import DataFrameComparator, ResultSet
+    >>> df1 = pl.DataFrame({'product': ['Apple', 'Pear'], 'state': ['TX', 'TX']})
+    >>> df2 = pl.DataFrame({'product': ['Apple', 'Apple'], 'state': ['TX', 'NV']})
+    >>> comp = DataFrameComparator(df1, df2)
+    >>> comp.comp_freq_many([('product',), ('state',)])
+    >>> path = f"{tempfile.mkdtemp()}/results.arrow"
+    >>> ResultSet(comp.results).write(path)
+    >>> stacked = ResultSet.read(path)
+    >>> stacked.table['dimensions'].unique().to_pylist()
+    ['product', 'state']
+    >>> [tuple(result.vars) for result in stacked.results]
+    [('product',), ('state',)]
+    """
+
+    def __init__(self, results: Iterable[Results]) -> None:
+        freq_results: list[FreqResults[pa.Table]] = []
+        for result in results:
+            if not isinstance(result, FreqResults):
+                msg = f"Only frequency results can be stacked, not {type(result).__name__}."
+                raise TypeError(msg)
+            frame = nw.from_native(result.data)
+            if isinstance(frame, nw.LazyFrame):
+                frame = frame.collect()
+            data = frame.select(*result.vars, *result.analysis_cols).to_arrow()
+            freq_results.append(
+                FreqResults(vars=result.vars, analysis_cols=result.analysis_cols, data=data)
+            )
+        self.table = _stack(freq_results)
+
+    @classmethod
+    def _from_table(cls, table: pa.Table) -> ResultSet:
+        if _RESULTS_KEY not in (table.schema.metadata or {}):
+            msg = "The table holds no result set, it was not written by `ResultSet.write`."
+            raise ValueError(msg)
+        result_set = cls.__new__(cls)
+        result_set.table = table
+        return result_set
+
+    @property
+    def results(self) -> list[FreqResults[pa.Table]]:
+        """The stacked results, as zero copy slices of `table`."""
+        return list(self._iter_results())
+
+    def _iter_results(self) -> Iterator[FreqResults[pa.Table]]:
+        offset = 0
+        for entry in json.loads(self.table.schema.metadata[_RESULTS_KEY]):
+            data = self.table.slice(offset, entry["rows"])
+            offset += entry["rows"]
+            yield FreqResults(
+                vars=tuple(entry["vars"]),
+                analysis_cols=tuple(entry["analysis_cols"]),
+                data=data.select([*entry["vars"], *entry["analysis_cols"]]),
+            )
+
+    def write(
+        self,
+        path: str | os.PathLike[str],
+        format: EXPORT_FORMATS | None = None,
+        compression: str | None = None,
+    ) -> None:
+        """Export the stacked results to a single file.
+
+        Parameters
+        ----------
+            path (str | PathLike): File to write.
+            format (str, optional): One of "ipc", "feather" or "parquet". Defaults to the
+                format of the suffix of `path`.
+            compression (str, optional): Codec to compress with. Defaults to none for IPC
+                and Feather, which are read back memory mapped only when uncompressed, and
+                to snappy for Parquet.
+        """
+        format = format or _SUFFIXES.get(Path(path).suffix.lower())
+        if format not in get_args(EXPORT_FORMATS):
+            msg = (
+                f"`format` must be one of {get_args(EXPORT_FORMATS)}, "
+                f"or inferred from a suffix of {tuple(_SUFFIXES)}, not {format!r}."
+            )
+            raise ValueError(msg)
+
+        if format == "parquet":
+            pq.write_table(self.table, str(path), compression=compression or "snappy")  # type: ignore[arg-type]
+        elif format == "feather":
+            feather.write_feather(self.table, path, compression=compression or "uncompressed")  # type: ignore[arg-type]
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression)  # type: ignore[arg-type]
+            with (
+                pa.OSFile(str(path), "wb") as sink,
+                pa.ipc.new_file(sink, self.table.schema, options=options) as writer,
+            ):
+                writer.write_table(self.table)
+
+    @classmethod
+    def read(cls, path: str | os.PathLike[str]) -> ResultSet:
+        """Open an exported result set, memory mapping IPC and Feather files.
+
+        The format is detected from the file itself. Parquet files are decoded, from a
+        memory map.
+        """
+        with Path(path).open("rb") as file:
+            magic = file.read(4)
+        if magic == b"PAR1":
+            table = pq.read_table(str(path), memory_map=True)
+        else:
+            table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        return cls._from_table(table)
+
+
+def _stack(results: list[FreqResults[pa.Table]]) -> pa.Table:
+    """Stack results as chunks under the union of their dimensions and analysis columns.
+
+    Every chunk shares one dictionary of dimension sets, as the IPC file format requires.
+    """
+    dims = union_dimensions(result.vars for result in results)
+    labels = [stringify_container(result.vars) for result in results]
+    positions = {label: i for i, label in enumerate(dict.fromkeys(labels))}
+    dictionary = pa.array(list(positions), pa.string())
+    types = {
+        col: result.data.schema.field(col).type
+        for result in reversed(results)
+        for col in result.data.column_names
+    }
+    analysis_cols = union_dimensions(result.analysis_cols for result in results)
+
+    chunks = []
+    for result, label in zip(results, labels, strict=True):
+        rows = result.data.num_rows
+        index = pa.repeat(pa.scalar(positions[label], pa.int32()), rows)  # type: ignore[call-overload]
+        columns: dict[str, Any] = {"dimensions": pa.DictionaryArray.from_arrays(index, dictionary)}
+        for col in (*dims, *analysis_cols):
+            in_result = col in result.data.column_names
+            columns[col] = result.data[col] if in_result else pa.nulls(rows, types[col])
+        chunks.append(pa.table(columns))
+
+    entries = [
+        {
+            "vars": list(result.vars),
+            "analysis_cols": list(result.analysis_cols),
+            "rows": result.data.num_rows,
+        }
+        for result in results
+    ]
+    if not chunks:
+        stacked = pa.table({"dimensions": pa.array([], pa.dictionary(pa.int32(), pa.string()))})
+    else:
+        stacked = pa.concat_tables(chunks, promote_options="permissive")
+    return stacked.replace_schema_metadata({_RESULTS_KEY: json.dumps(entries)})
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, cast
+
+from drift_scope._sql import SQL_STRATEGIES, SQLConnections
+from drift_scope.sql import SQLComparator
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Iterable
+    from typing import Any
+
+    from drift_scope._sql import SQL_CONNECTIONS, _SQLConnectionProtocol
+    from drift_scope.profiles import ProfileStore
+    from drift_scope.results import FreqResults
+    from drift_scope.tracing import Tracer
+
+type ComparisonJob = tuple[str, str, Collection[str]]
+
+
+class _ConnectionPool:
+    """Bounded pool of connections, opened on first demand and closed together."""
+
+    def __init__(self, open: Callable[[], Any], size: int) -> None:
+        self._open = open
+        self._size = size
+        self._idle: queue.Queue[Any] = queue.Queue()
+        self._opened: list[Any] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Any:
+        """Take an idle connection, opening one while below the pool size."""
+        with self._lock:
+            if self._idle.empty() and len(self._opened) < self._size:
+                self._opened.append(self._open())
+                return self._opened[-1]
+        return self._idle.get()
+
+    def release(self, con: Any) -> None:
+        self._idle.put(con)
+
+    def close(self, close: Callable[[Any], None]) -> None:
+        """Close every connection the pool opened."""
+        for con in self._opened:
+            close(con)
+        self._opened.clear()
+
+
+class SQLScheduler:
+    """Run many table pair comparisons concurrently, over a bounded pool of connections.
+
+    Jobs comparing the same pair of tables share one `SQLComparator`, so their dimension
+    sets are counted together by `comp_freq_many`. Pairs run in parallel on at most
+    `max_concurrency` connections, each pair on one connection at a time.
+
+    DuckDB connections are pooled as cursors of `con`. Postgres connections cannot be
+    duplicated, pass a `connect` factory returning a new cursor on a new connection.
+
+    A `tracer` is shared by the comparators of every pair, recording each on its thread.
+    A `profile_store` is shared likewise, every dimension set of a pair is compared to the
+    stored profile of its first table.
+
+    Examples
+    --------
+    >>> import duckdb
+    >>> from drift_scope import SQLScheduler
+    >>> con = duckdb.connect()
+    >>> for table in ('sales_2023', 'sales_2024', 'stock_2023', 'stock_2024'):
+    ...     _ = con.execute(f"CREATE TABLE {table} AS SELECT 'Apple' AS product, 'TX' AS state")
+    >>> scheduler = SQLScheduler(con, "DUCKDB", max_concurrency=2)
+    >>> results = scheduler.run([
+    ...     ('sales_2023', 'sales_2024', ('product',)),
+    ...     ('stock_2023', 'stock_2024', ('state',)),
+    ...     ('sales_2023', 'sales_2024', ('state',)),
+    ... ])
+    >>> [tuple(result.vars) for result in results]
+    [('product',), ('state',), ('state',)]
+    """
+
+    def __init__(
+        self,
+        con: Any,
+        con_type: SQL_CONNECTIONS,
+        max_concurrency: int = 4,
+        connect: Callable[[], Any] | None = None,
+        work_schema: str | None = None,
+        strategy: SQL_STRATEGIES = "pushdown",
+        profile_store: ProfileStore | None = None,
+        tracer: Tracer | None = None,
+    ) -> None:
+        try:
+            self.protocol: type[_SQLConnectionProtocol] = SQLConnections[con_type].value
+        except KeyError as ke:
+            raise NotImplementedError from ke
+
+        if max_concurrency < 1:
+            msg = f"`max_concurrency` must be positive, not {max_concurrency!r}."
+            raise ValueError(msg)
+        if connect is None and con_type == "PSYCOPG2":
+            msg = "Postgres connections cannot be forked, pass a `connect` factory of cursors."
+            raise ValueError(msg)
+
+        self.con = con
+        self.con_type = con_type
+        self.max_concurrency = max_concurrency
+        self.connect = connect
+        self.work_schema = work_schema
+        self.strategy = strategy
+        self.profile_store = profile_store
+        self.tracer = tracer
+
+    def run(self, jobs: Iterable[ComparisonJob]) -> list[FreqResults[Any]]:
+        """Compare every `(df1, df2, vars)` job, returning one result per job in job order."""
+        jobs = list(jobs)
+        pairs: dict[tuple[str, str], list[int]] = {}
+        for i, (df1, df2, _) in enumerate(jobs):
+            pairs.setdefault((df1, df2), []).append(i)
+
+        workers = max(min(self.max_concurrency, len(pairs)), 1)
+        pool = _ConnectionPool(self.connect or (lambda: self.protocol.fork(self.con)), workers)
+
+        def compare(df1: str, df2: str, indices: list[int]) -> list[FreqResults[Any]]:
+            con = pool.acquire()
+            try:
+                comp = SQLComparator(
+                    df1=df1,
+                    df2=df2,
+                    con=con,
+                    con_type=self.con_type,
+                    work_schema=self.work_schema,
+                    strategy=self.strategy,
+                    profile_store=self.profile_store,
+                )
+                comp.tracer = self.tracer
+                comp.comp_freq_many(jobs[i][2] for i in indices)
+            finally:
+                pool.release(con)
+
+            freq_results = cast("list[FreqResults[Any]]", comp.results)
+            by_vars = {tuple(result.vars): result for result in freq_results}
+            return [by_vars[tuple(jobs[i][2])] for i in indices]
+
+        results: list[FreqResults[Any] | None] = [None] * len(jobs)
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    pair: executor.submit(compare, *pair, indices)
+                    for pair, indices in pairs.items()
+                }
+                for pair, future in futures.items():
+                    for i, result in zip(pairs[pair], future.result(), strict=True):
+                        results[i] = result
+        finally:
+            pool.close(self.protocol.close)
+
+        return cast("list[FreqResults[Any]]", results)
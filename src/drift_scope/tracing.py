@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Protocol
+
+import narwhals as nw
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from typing import Concatenate
+
+    from drift_scope.results import Results
+
+## Shared by every disabled span, entering it yields None:
+_NO_SPAN: contextlib.nullcontext[None] = contextlib.nullcontext()
+
+
+@dataclass
+class Span:
+    """A timed stage of a comparison, with the spans of its substages as `children`.
+
+    `attrs` holds what the stage reported, i.e. the `sql` it emitted, and the `rows` and
+    `bytes` it materialized. `peak_rss` is the peak resident memory of the process in
+    bytes when the stage ended, None where the platform does not report it.
+    """
+
+    name: str
+    attrs: dict[str, Any] = field(default_factory=dict)
+    seconds: float = 0.0
+    peak_rss: int | None = None
+    children: list[Span] = field(default_factory=list)
+
+    def walk(self) -> Iterator[Span]:
+        """Yield the span and every span nested in it, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Count, seconds, rows and bytes of every stage name nested in this span, summed.
+
+        Nested stages of the same name are counted for each, so seconds of a stage
+        nested in itself add up to more than the wall time.
+        """
+        return _summarize(self.walk())
+
+    def to_dict(self) -> dict[str, Any]:
+        """The span and its children as plain, JSON serializable, data."""
+        return {
+            "name": self.name,
+            "attrs": self.attrs,
+            "seconds": self.seconds,
+            "peak_rss": self.peak_rss,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class Tracer:
+    """Records a `Span` of every stage of the comparisons of comparators it is set on.
+
+    Set a tracer as the `tracer` of a comparator. Every public operation, i.e.
+    `comp_freq`, is then recorded as a root span in `spans`, nesting its stages: the
+    aggregation, join and diff of the data, every SQL statement executed, the collection
+    of lazy results and the rendering of reports. Each result appended by an operation
+    gets the span of that operation as its `trace`.
+
+    `callbacks` are called with every span as it ends, innermost first, i.e. to feed a
+    metrics pipeline. Comparators without a tracer record nothing. Spans of one thread
+    nest, so a tracer can be shared by comparators running on many threads.
+
+    Examples
+    --------
+    >>> import polars as pl
+    >>> from drift_scope import DataFrameComparator, Tracer
+    >>> df1 = pl.DataFrame({'product': ['Apple', 'Banana']})
+    >>> df2 = pl.DataFrame({'product': ['Apple', 'Grapes']})
+    >>> comp = DataFrameComparator(df1, df2)
+    >>> ended = []
+    >>> comp.tracer = Tracer(callbacks=[lambda span: ended.append(span.name)])
+    >>> comp.comp_freq(vars=('product',))
+    >>> ended
+    ['rollup', 'aggregate', 'comp_freq']
+    >>> trace = comp.results[0].trace
+    >>> trace.summary()['aggregate']['rows']
+    3.0
+    """
+
+    def __init__(self, callbacks: Iterable[Callable[[Span], None]] = ()) -> None:
+        self.callbacks = list(callbacks)
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        """Time a stage, nested in the innermost span open on this thread."""
+        stack: list[Span] = self._local.__dict__.setdefault("stack", [])
+        span = Span(name, attrs)
+        parent = stack[-1] if stack else None
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            span.seconds = time.perf_counter() - start
+            span.peak_rss = _peak_rss()
+            stack.pop()
+            if parent is not None:
+                parent.children.append(span)
+            else:
+                with self._lock:
+                    self.spans.append(span)
+            for callback in self.callbacks:
+                callback(span)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Count, seconds, rows and bytes of every stage name of all spans, summed."""
+        return _summarize(span for root in self.spans for span in root.walk())
+
+    def clear(self) -> None:
+        """Drop every recorded span."""
+        with self._lock:
+            self.spans.clear()
+
+
+def _summarize(spans: Iterable[Span]) -> dict[str, dict[str, float]]:
+    summary: dict[str, dict[str, float]] = {}
+    for span in spans:
+        stage = summary.setdefault(
+            span.name, {"count": 0, "seconds": 0.0, "rows": 0.0, "bytes": 0.0}
+        )
+        stage["count"] += 1
+        stage["seconds"] += span.seconds
+        stage["rows"] += span.attrs.get("rows", 0)
+        stage["bytes"] += span.attrs.get("bytes", 0)
+    return summary
+
+
+def _peak_rss() -> int | None:
+    """Peak resident set size of the process in bytes, None where not reported."""
+    if resource is None:
+        return None
+    ## Linux reports kilobytes, macOS bytes:
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def start_span(
+    tracer: Tracer | None, name: str, **attrs: Any
+) -> contextlib.AbstractContextManager[Span | None]:
+    """A span of `tracer`, or a shared no-op yielding None without a tracer."""
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, **attrs)
+
+
+def record_frame(span: Span | None, frame: Any) -> None:
+    """Add the rows and estimated bytes of an eager frame or batch to the attributes of `span`.
+
+    Lazy frames are not materialized yet, and recorded when collected instead.
+    """
+    if span is None:
+        return
+    ## Arrow data implies pyarrow is imported, which is not imported for anything else:
+    pa = sys.modules.get("pyarrow")
+    if pa is not None and isinstance(frame, pa.RecordBatch | pa.Table):
+        rows, size = frame.num_rows, frame.nbytes
+    else:
+        eager = nw.from_native(frame)
+        if not isinstance(eager, nw.DataFrame):
+            return
+        rows, size = len(eager), int(eager.estimated_size("b"))
+    span.attrs["rows"] = span.attrs.get("rows", 0) + rows
+    span.attrs["bytes"] = span.attrs.get("bytes", 0) + size
+
+
+class _Traced(Protocol):
+    tracer: Tracer | None
+    results: list[Results]
+
+
+def traced[T: _Traced, **P, R](
+    method: Callable[Concatenate[T, P], R],
+) -> Callable[Concatenate[T, P], R]:
+    """Record calls of a public operation as spans of the tracer of the comparator.
+
+    Results appended by the call without a trace of their own get the span of the call.
+    Without a tracer the call costs one attribute lookup.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self: T, /, *args: P.args, **kwargs: P.kwargs) -> R:
+        if self.tracer is None:
+            return method(self, *args, **kwargs)
+
+        appended = len(self.results)
+        with self.tracer.span(method.__name__, comparator=type(self).__name__) as span:
+            out = method(self, *args, **kwargs)
+        for result in self.results[appended:]:
+            if result.trace is None:
+                result.trace = span
+        return out
+
+    return wrapper
@@ -2,25 +2,57 @@ from __future__ import annotations
 
 import contextlib
 import copy
+import json
+import math
+import re
+import subprocess
+import sys
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, cast, get_args
 
 import duckdb
+import narwhals as nw
+import pandas as pd
 import polars as pl
 import psycopg2
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 import pytest
+from polars.testing import assert_frame_equal
 from testcontainers.postgres import PostgresContainer
 
-from drift_scope._sql import SQL_CONNECTIONS, SQLConnections
-from drift_scope.dataframe import DataFrameComparator
-from drift_scope.results import FreqResults
+from drift_scope._cache import FreqCache
+from drift_scope._parallel import _pool_context
+from drift_scope._sketch import stable_hashes
+from drift_scope._sql import SQL_CONNECTIONS, SQL_STRATEGIES, SQLConnections
+from drift_scope._utils import pages, top_rows
+from drift_scope.arrow import ArrowComparator
+from drift_scope.dataframe import DATAFRAME_STRATEGIES, DataFrameComparator
+from drift_scope.profiles import ProfileStore
+from drift_scope.resultset import ResultSet
+from drift_scope.scheduler import SQLScheduler
+from drift_scope.snapshots import (
+    BaseSnapshotComparator,
+    DataFrameSnapshotComparator,
+    SQLSnapshotComparator,
+)
 from drift_scope.sql import SQLComparator
+from drift_scope.tracing import Span, Tracer
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Generator
+    from collections.abc import Callable, Collection, Generator, Sequence
+    from pathlib import Path
     from typing import Any, Literal
 
     from drift_scope.base import BaseComparator
+    from drift_scope.results import (
+        DistResults,
+        FreqResults,
+        RowDiffResults,
+        SketchResults,
+        SnapshotResults,
+    )
 
     type GenReturn = Generator[Any, None, None]
     type ConYielder = Callable[[], GenReturn]
@@ -44,9 +76,10 @@ def _get_duckdb() -> GenReturn:
 @dataclass
 class _Args:  # TODO: Change the name of this
     con_type: SQL_CONNECTIONS | Literal["NARWHALS"]  # TODO : rename to engine
-    comparator: BaseComparator
+    comparator: Callable[..., BaseComparator]
     yielder: Any = contextlib.nullcontext  # TODO: Need better name
     work_schema: str | None = None
+    strategy: SQL_STRATEGIES = "pushdown"
 
 
 args: tuple[_Args, ...] = (
@@ -58,11 +91,13 @@ args: tuple[_Args, ...] = (
 schema_opts = (None, "fooschema")
 expanded_args: list[_Args] = []
 for arg in args:
-    if arg.con_type in SQL_CONNECTIONS:
-        for schema in schema_opts:  # expand by schema
-            args_copy: _Args = copy.copy(arg)
-            args_copy.work_schema = schema
-            expanded_args.append(args_copy)
+    if arg.con_type in get_args(SQL_CONNECTIONS):
+        for strategy in get_args(SQL_STRATEGIES):  # expand by strategy
+            for schema in schema_opts:  # expand by schema
+                args_copy: _Args = copy.copy(arg)
+                args_copy.work_schema = schema
+                args_copy.strategy = strategy
+                expanded_args.append(args_copy)
         continue
     expanded_args.append(arg)
 
@@ -109,6 +144,7 @@ def test_manual1(arg: _Args) -> None:
                 con=con,
                 con_type=arg.con_type,
                 work_schema=arg.work_schema,
+                strategy=arg.strategy,
             )
 
         comp.comp_freq(vars=("city", "state"))
@@ -125,7 +161,7 @@ def test_manual1(arg: _Args) -> None:
     assert len(comp.results) == 1, msg
 
     ## Check Data Manually:
-    comp_results: FreqResults = cast(FreqResults, comp.results[0])
+    comp_results: FreqResults[Any] = cast("FreqResults[Any]", comp.results[0])
     comp_data = comp_results.data
     res_pl = pl.DataFrame(pl.from_arrow(comp_data))  # TODO: Not a good solution
 
@@ -164,6 +200,997 @@ def test_manual1(arg: _Args) -> None:
     comp.compile_report()  # prints reports
 
 
+def _create_comparator(
+    arg: _Args, con: Any, table1: dict[str, list[str | None]], table2: dict[str, list[str | None]]
+) -> BaseComparator:
+    """Load two tables of strings into the engine of `arg` and compare them."""
+    if arg.con_type == "NARWHALS":
+        return arg.comparator(pl.DataFrame(table1), pl.DataFrame(table2))
+
+    con.execute("BEGIN TRANSACTION;")
+    if arg.work_schema:
+        con.execute(f"CREATE SCHEMA {arg.work_schema}")
+    _load_tables(con, {"table1": table1, "table2": table2})
+    con.execute("COMMIT;")
+
+    return arg.comparator(
+        df1="table1",
+        df2="table2",
+        con=con,
+        con_type=arg.con_type,
+        work_schema=arg.work_schema,
+        strategy=arg.strategy,
+    )
+
+
+def _load_tables(con: Any, tables: dict[str, dict[str, list[str | None]]]) -> None:
+    """Create a table of strings per name in `tables`."""
+    for name, table in tables.items():
+        con.execute(f"CREATE TABLE {name} ({', '.join(f'{col} VARCHAR' for col in table)})")
+        values = (
+            "(" + ", ".join("NULL" if val is None else f"'{val}'" for val in row) + ")"
+            for row in zip(*table.values(), strict=True)
+        )
+        con.execute(f"INSERT INTO {name} VALUES {', '.join(values)}")
+
+
+def _to_polars(data: Any, by: Sequence[str]) -> pl.DataFrame:
+    """Convert any result data to a polars frame sorted by `by`."""
+    return pl.DataFrame(pl.from_arrow(nw.from_native(data).to_arrow())).sort(by, nulls_last=True)
+
+
+_TABLE1: dict[str, list[str | None]] = {
+    "city": ["Austin", "Austin", "Dallas", "Reno", None],
+    "state": ["TX", "TX", "TX", "NV", "NV"],
+    "channel": ["web", "store", "web", "web", "store"],
+}
+_TABLE2: dict[str, list[str | None]] = {
+    "city": ["Austin", "Houston", "Houston", "Reno", None],
+    "state": ["TX", "TX", "TX", "NV", None],
+    "channel": ["web", "web", "web", "store", "store"],
+}
+
+
+@pytest.mark.parametrize("arg", expanded_args)
+def test_comp_freq_many(arg: _Args) -> None:
+    """Batched dimension sets must match one comparison per dimension set."""
+    dimension_sets: tuple[tuple[str, ...], ...] = (
+        ("state",),
+        ("city", "state"),
+        ("channel",),
+        ("state",),
+        ("state", "city"),
+    )
+    unique_sets = (*dimension_sets[:3], dimension_sets[4])
+
+    with arg.yielder() as con:
+        comp = _create_comparator(arg, con, _TABLE1, _TABLE2)
+        comp.comp_freq_many(dimension_sets)
+        comp.freq_cache.clear()
+        comp.freq_cache.max_bytes = 0  # compute every single comparison from source
+        for vars in unique_sets:
+            comp.comp_freq(vars)
+
+    msg = "One result is expected per unique dimension set"
+    assert len(comp.results) == 2 * len(unique_sets), msg
+
+    for i, vars in enumerate(unique_sets):
+        batched = cast("FreqResults[Any]", comp.results[i])
+        single = cast("FreqResults[Any]", comp.results[i + len(unique_sets)])
+        assert tuple(batched.vars) == vars
+
+        cols = [*vars, *comp.comp_freq_analysis_cols]
+        batched_pl = _to_polars(batched.data, vars).select(cols)
+        single_pl = _to_polars(single.data, vars).select(cols)
+        assert batched_pl.equals(single_pl), f"Batched comparison differs for {vars}"
+
+
+@pytest.mark.parametrize("arg", expanded_args)
+def test_rollup_cache(arg: _Args) -> None:
+    """Coarser dimension sets are rolled up from a cached finer comparison."""
+    with arg.yielder() as con:
+        comp = _create_comparator(arg, con, _TABLE1, _TABLE2)
+        comp.comp_freq(("state",))
+        comp.freq_cache.clear()
+        comp.comp_freq(("city", "state"))
+
+        comp.__dict__.update(df1=None, df2=None)  # any further scan would fail
+        comp.comp_freq(("state",))
+        comp.comp_freq_many([("city",), ("state", "city")])
+
+    msg = "Results must be filled out from the cache"
+    assert len(comp.results) == 5, msg
+
+    expected = cast("FreqResults[Any]", comp.results[0])
+    rolled_up = cast("FreqResults[Any]", comp.results[2])
+    assert _to_polars(rolled_up.data, ["state"]).equals(_to_polars(expected.data, ["state"]))
+
+    finest = _to_polars(cast("FreqResults[Any]", comp.results[1]).data, ["city", "state"])
+    reordered = _to_polars(cast("FreqResults[Any]", comp.results[4]).data, ["city", "state"])
+    assert reordered.equals(finest.select("state", "city", *comp.comp_freq_analysis_cols))
+
+
+@pytest.mark.parametrize("arg", expanded_args)
+def test_comp_freq_sketch(arg: _Args) -> None:
+    """Sketches of few keys must reproduce the exact comparison."""
+    vars = ("city", "state")
+    with arg.yielder() as con:
+        comp = _create_comparator(arg, con, _TABLE1, _TABLE2)
+        comp.comp_freq(vars)
+        comp.comp_freq_sketch(vars, top_k=3)
+
+    exact = _to_polars(cast("FreqResults[Any]", comp.results[0]).data, vars)
+    sketch = cast("SketchResults", comp.results[1])
+    sketched = _to_polars(sketch.data, vars)
+
+    msg = "The top drifting keys must be reported with their exact counts"
+    top_abs_diffs = sorted(exact["abs_diff"].to_list(), reverse=True)[:3]
+    assert sorted(sketched["abs_diff"].to_list(), reverse=True) == top_abs_diffs, msg
+    matched = sketched.join(exact, on=list(vars), join_nulls=True, suffix="_exact")
+    assert matched.height == 3, msg
+    assert matched["n1"].equals(matched["n1_exact"]), msg
+    assert matched["n2"].equals(matched["n2_exact"]), msg
+
+    assert (sketch.total1, sketch.total2) == (5, 5)
+    assert sketch.new_distinct == exact.filter(pl.col("n1") == 0).height
+    assert sketch.vanished_distinct == exact.filter(pl.col("n2") == 0).height
+    assert sketch.distinct1 == exact.filter(pl.col("n1") > 0).height
+    sketch.report_as_table()
+
+
+@pytest.mark.parametrize("native", [pl.LazyFrame, pd.DataFrame])
+def test_sketch_backends(native: Callable[[dict[str, list[str | None]]], Any]) -> None:
+    """Streamed lazy frames and arrow hashed backends must sketch as eager polars does."""
+    vars = ("city", "state")
+    sketches = []
+    for frame in (pl.DataFrame, native):
+        comp = DataFrameComparator(frame(_TABLE1), frame(_TABLE2))
+        comp.sketch_batch_size = 2  # stream every dataframe in several batches
+        comp.comp_freq_sketch(vars, top_k=3)
+        sketches.append(cast("SketchResults", comp.results[0]))
+
+    eager, other = sketches
+    assert_frame_equal(_to_polars(other.data, vars), _to_polars(eager.data, vars))
+    assert (other.total1, other.distinct1, other.new_distinct) == (
+        eager.total1,
+        eager.distinct1,
+        eager.new_distinct,
+    )
+
+
+@pytest.mark.parametrize("arg", expanded_args)
+def test_comp_freq_sample(arg: _Args) -> None:
+    """A full sample must match the exact comparison, with bounds around `pct_diff`."""
+    vars = ("state", "channel")
+    with arg.yielder() as con:
+        comp = _create_comparator(arg, con, _TABLE1, _TABLE2)
+        comp.comp_freq(vars)
+        comp.comp_freq(vars, sample=1)
+        with pytest.raises(ValueError, match="sample"):
+            comp.comp_freq(vars, sample=0)
+
+    msg = "Sampled comparisons must bypass the cache"
+    assert len(comp.freq_cache) == 1, msg
+
+    exact = _to_polars(cast("FreqResults[Any]", comp.results[0]).data, vars)
+    sampled = cast("FreqResults[Any]", comp.results[1])
+    assert tuple(sampled.analysis_cols) == comp.comp_freq_sample_analysis_cols
+    sampled_pl = _to_polars(sampled.data, vars)
+    assert sampled_pl.columns == [*vars, *comp.comp_freq_sample_analysis_cols]
+
+    for col in ("n1", "n2", "real_diff", "abs_diff", "pct_diff"):
+        assert sampled_pl[col].cast(pl.Float64).equals(exact[col].cast(pl.Float64)), col
+    assert (sampled_pl["pct_diff_lower"] <= sampled_pl["pct_diff"]).all()
+    assert (sampled_pl["pct_diff"] <= sampled_pl["pct_diff_upper"]).all()
+    assert (sampled_pl["pct_diff_lower"] >= -1).all(), "Wilson bounds stay within [-1, 1]"
+    assert (sampled_pl["pct_diff_upper"] <= 1).all(), "Wilson bounds stay within [-1, 1]"
+
+
+@pytest.mark.parametrize("arg", expanded_args)
+def test_profile_store(arg: _Args, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Baseline profiles are counted once, reused across comparators and never stale."""
+    vars = ("state", "channel")
+    store = ProfileStore(tmp_path)
+    with arg.yielder() as con:
+        comp = _create_comparator(arg, con, _TABLE1, _TABLE2)
+        comp.comp_freq(vars)
+        comp.profile_store = store
+        comp.freq_cache.clear()
+        comp.comp_freq(vars)
+        assert len(store) == 1
+
+        counted: list[Any] = []
+        count_dataset = comp._count_dataset
+
+        def _count(vars: Collection[str], dataset: Any) -> nw.DataFrame[Any]:
+            counted.append(dataset)
+            counts: nw.DataFrame[Any] = count_dataset(vars, dataset)
+            return counts
+
+        monkeypatch.setattr(comp, "_count_dataset", _count)
+        comp.freq_cache.clear()
+        comp.comp_freq(vars)
+        assert len(counted) == 1, "Only the target must be counted with a stored profile"
+
+    exact = _to_polars(cast("FreqResults[Any]", comp.results[0]).data, vars)
+    for res in comp.results[1:]:
+        data = _to_polars(cast("FreqResults[Any]", res).data, vars)
+        assert_frame_equal(data, exact, check_dtypes=False)
+
+    baseline = pl.DataFrame(_TABLE2)
+    changed = DataFrameComparator(baseline, pl.DataFrame(_TABLE2), profile_store=store)
+    changed.comp_freq(vars)
+    data = _to_polars(cast("FreqResults[Any]", changed.results[0]).data, vars)
+    assert (data["n1"] == data["n2"]).all(), "A changed baseline must not reuse its profile"
+
+
+_PROFILE_RELOAD = """
+import importlib, json, sys
+from drift_scope import DataFrameComparator, ProfileStore, Tracer
+
+native = importlib.import_module(sys.argv[2])
+table = {"state": ["TX", "TX", "NV"], "channel": ["web", "store", None]}
+store = ProfileStore(sys.argv[1])
+comp = DataFrameComparator(
+    native.DataFrame(table), native.DataFrame(table), profile_store=store, profile_name="base"
+)
+comp.tracer = Tracer()
+comp.comp_freq(("state", "channel"))
+print(json.dumps([span.attrs["hit"] for span in comp.tracer.spans[0].walk() if span.name == "profile"]))
+"""
+
+
+@pytest.mark.parametrize("native", ["pandas", "polars"])
+def test_profile_reload(native: str, tmp_path: Path) -> None:
+    """Profiles of dataframes are served to later processes, and kept apart per name."""
+    hits = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", _PROFILE_RELOAD, str(tmp_path), native],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+        )
+        for _ in range(2)
+    ]
+    assert hits == [[False], [True]], "A profile must be stored, then reloaded"
+
+    store = ProfileStore(tmp_path)
+    store.clear()
+    for baseline, name in ((_TABLE1, "one"), (_TABLE2, "two"), (_TABLE1, None), (_TABLE2, None)):
+        comp = DataFrameComparator(
+            pl.DataFrame(baseline), pl.DataFrame(_TABLE2), profile_store=store, profile_name=name
+        )
+        comp.comp_freq(("state",))
+    assert len(store) == 3, "Named baselines keep their profiles, unnamed ones share theirs"
+
+
+@pytest.mark.parametrize("arg", expanded_args)
+def test_comp_freq_all_columns(arg: _Args) -> None:
+    """Every selected column must compare as its own `comp_freq` would."""
+    with arg.yielder() as con:
+        comp = _create_comparator(arg, con, _TABLE1, _TABLE2)
+        comp.comp_freq_all_columns(exclude=("city",))
+        with pytest.raises(ValueError, match="No columns"):
+            comp.comp_freq_all_columns(include=("missing",))
+        for var in ("state", "channel"):
+            comp.comp_freq((var,))
+
+    results = cast("list[FreqResults[Any]]", comp.results)
+    assert [tuple(result.vars) for result in results[:2]] == [("state",), ("channel",)]
+    for unpivoted, exact in zip(results[:2], results[2:], strict=True):
+        vars = list(exact.vars)
+        assert_frame_equal(
+            _to_polars(unpivoted.data, vars), _to_polars(exact.data, vars), check_dtypes=False
+        )
+
+
+@pytest.mark.parametrize("arg", expanded_args)
+def test_comp_freq_wide(arg: _Args) -> None:
+    """Tables wider than Postgres' 31 GROUPING() arguments compare every column."""
+    width = 40
+    wide1, wide2 = (
+        cast(
+            "dict[str, list[str | None]]",
+            {
+                f"c{i}": [f"{(row * (i + 1) + offset) % 3}" for row in range(6)]
+                for i in range(width)
+            },
+        )
+        for offset in (0, 1)
+    )
+    cols = [f"c{i}" for i in range(width)]
+    with arg.yielder() as con:
+        comp = _create_comparator(arg, con, wide1, wide2)
+        comp.comp_freq_all_columns()
+        comp.freq_cache.clear()
+        comp.comp_freq_many((col,) for col in cols)
+
+    expected = DataFrameComparator(pl.DataFrame(wide1), pl.DataFrame(wide2))
+    expected.comp_freq_all_columns()
+    results = cast("list[FreqResults[Any]]", comp.results)
+    assert len(results) == 2 * width
+    for i, result in enumerate(results):
+        vars = list(result.vars)
+        assert vars == [cols[i % width]]
+        exact = _to_polars(cast("FreqResults[Any]", expected.results[i % width]).data, vars)
+        data = _to_polars(result.data, vars).select(exact.columns)
+        assert_frame_equal(data, exact, check_dtypes=False)
+
+
+@pytest.mark.parametrize("arg", expanded_args)
+def test_comp_dist(arg: _Args) -> None:
+    """Both datasets are binned by the quantiles of the first, nulls are ignored."""
+    tables: dict[str, list[int | None]] = {
+        "prices1": [1, 2, 3, 4, 5, 6, 7, 8, None],
+        "prices2": [5, 6, 7, 8, 9, 10, 11, 12],
+    }
+    with arg.yielder() as con:
+        if arg.con_type == "NARWHALS":
+            frames = [pl.DataFrame({"price": values}) for values in tables.values()]
+            comp = arg.comparator(*frames)
+            same = arg.comparator(frames[0], frames[0])
+        else:
+            for name, values in tables.items():
+                con.execute(f"CREATE TABLE {name} (price DOUBLE PRECISION)")
+                rows = ", ".join(f"({'NULL' if val is None else val})" for val in values)
+                con.execute(f"INSERT INTO {name} VALUES {rows}")
+            comp, same = (
+                arg.comparator(df1="prices1", df2=df2, con=con, con_type=arg.con_type)
+                for df2 in ("prices2", "prices1")
+            )
+
+        comp.comp_dist(("price",), bins=4)
+        same.comp_dist(("price",), bins=4)
+        with pytest.raises(ValueError, match="bins"):
+            comp.comp_dist(("price",), bins=1)
+
+    drifted, identical = (cast("DistResults", c.results[0]) for c in (comp, same))
+    assert drifted.data["upper"].to_pylist()[:-1] == [2.75, 4.5, 6.25]
+    assert drifted.data["n1"].to_pylist() == [2, 2, 2, 2]
+    assert drifted.data["n2"].to_pylist() == [0, 0, 2, 6]
+    assert drifted.ks == pytest.approx(0.5)
+    assert drifted.psi > 0.25
+    assert drifted.wasserstein > 0
+    assert (identical.psi, identical.ks, identical.wasserstein) == (0, 0, 0)
+
+
+_TABLE3: dict[str, list[str | None]] = {
+    "city": ["Austin", "Austin", "Austin", "Austin", "Austin"],
+    "state": ["TX", "TX", "TX", "TX", "TX"],
+    "channel": ["web", "web", "web", "web", "web"],
+}
+
+
+@pytest.mark.parametrize(
+    ("arg", "native"),
+    [
+        (arg, native)
+        for arg in args
+        for native in ((pl.DataFrame, pa.table) if arg.con_type == "NARWHALS" else (None,))
+    ],
+)
+def test_snapshot_comparator(
+    arg: _Args, native: Callable[[dict[str, list[str | None]]], Any] | None
+) -> None:
+    """Every target must compare to the baseline as its own pairwise comparison would."""
+    vars = ["city", "state"]
+    targets = [_TABLE2, _TABLE3]
+    with arg.yielder() as con:
+        if arg.con_type == "NARWHALS":
+            assert native is not None
+            comp: BaseSnapshotComparator = DataFrameSnapshotComparator(
+                native(_TABLE1), [native(target) for target in targets]
+            )
+        else:
+            _load_tables(con, {"base": _TABLE1, "day1": _TABLE2, "day2": _TABLE3})
+            comp = SQLSnapshotComparator("base", ["day1", "day2"], con=con, con_type=arg.con_type)
+        comp.tracer = Tracer()
+        comp.comp_freq(vars)
+        comp.comp_freq(["state"])
+        comp.collect()
+        with pytest.raises(ValueError, match="labels"):
+            DataFrameSnapshotComparator(pl.DataFrame(_TABLE1), [pl.DataFrame(_TABLE2)], ["a", "b"])
+
+    hits = [
+        span.attrs["hit"]
+        for root in comp.tracer.spans
+        for span in root.walk()
+        if span.name == "rollup"
+    ]
+    assert hits == [False, True], "Coarser dimension sets must roll up from the cache"
+    result, rolled_up = (cast("SnapshotResults[Any]", res) for res in comp.results)
+    assert result.labels == ["1", "2"]
+    assert result.trace is not None
+    snapshots = _to_polars(result.data, vars)
+    expected_state = snapshots.group_by("state").agg(pl.col("n_base", "n_1", "n_2").sum())
+    assert_frame_equal(
+        _to_polars(rolled_up.data, ["state"]).select(expected_state.columns),
+        expected_state,
+        check_dtypes=False,
+        check_row_order=False,
+    )
+    for i, target in enumerate(targets, start=1):
+        pairwise = DataFrameComparator(pl.DataFrame(_TABLE1), pl.DataFrame(target))
+        pairwise.comp_freq(vars)
+        expected = _to_polars(cast("FreqResults[Any]", pairwise.results[0]).data, vars)
+        actual = snapshots.select(
+            *vars, n1="n_base", n2=f"n_{i}", real_diff=f"real_diff_{i}", pct_diff=f"pct_diff_{i}"
+        ).filter(pl.col("n1") + pl.col("n2") > 0)
+        assert_frame_equal(
+            actual, expected.select(actual.columns), check_dtypes=False, check_row_order=False
+        )
+    assert snapshots["max_abs_pct_diff"].to_list() == [
+        max(abs(row[f"pct_diff_{i}"]) for i in (1, 2)) for row in snapshots.iter_rows(named=True)
+    ]
+
+
+@pytest.mark.parametrize("arg", [arg for arg in args if arg.con_type != "NARWHALS"])
+@pytest.mark.parametrize(("factor", "threshold"), [(32, 1024), (2, 1)])
+def test_comp_rows(arg: _Args, factor: int, threshold: int) -> None:
+    """Bisection must find every changed key, whether it fetches at once or bisects to rows."""
+    with arg.yielder() as con:
+        con.execute(
+            "CREATE TABLE rows1 AS SELECT i % 7 AS k1, CAST(i AS VARCHAR) AS k2, i AS v "
+            "FROM generate_series(1, 500) AS g(i)"
+        )
+        con.execute("CREATE TABLE rows2 AS SELECT * FROM rows1")
+        con.execute("DELETE FROM rows2 WHERE v IN (3, 250)")
+        con.execute("UPDATE rows2 SET v = -v WHERE v IN (10, 499)")
+        con.execute("INSERT INTO rows2 VALUES (0, 'it''s', 1), (9, '1', NULL)")
+
+        comp, same = (
+            SQLComparator(
+                df1="rows1", df2=df2, con=con, con_type=cast("SQL_CONNECTIONS", arg.con_type)
+            )
+            for df2 in ("rows2", "rows1")
+        )
+        comp.bisection_factor, comp.bisection_threshold = factor, threshold
+        comp.comp_rows(keys=("k1", "k2"))
+        same.comp_rows(keys=("k1", "k2"))
+        with pytest.raises(ValueError, match="key column"):
+            comp.comp_rows(keys=())
+
+    result, identical = (cast("RowDiffResults", c.results[0]) for c in (comp, same))
+    assert sorted(result.inserted) == [(0, "it's"), (9, "1")]
+    assert sorted(result.deleted) == [(3, "3"), (5, "250")]
+    assert sorted(result.updated) == [(2, "499"), (3, "10")]
+    assert identical.data.num_rows == 0
+    assert identical.rows_fetched == 0
+    if threshold == 1:
+        ## Bisecting down to single rows fetches only the changed ones, updated from both:
+        assert result.rows_fetched == 8
+    result.report_as_table()
+
+
+def _comparisons_per_row(query: str) -> int:
+    """Most `WHEN` conditions a row may evaluate, along any path of nested `CASE`s."""
+    whens: list[int] = []
+    most = 0
+    for token in re.findall(r"\b(?:CASE|WHEN|END)\b", query):
+        if token == "CASE":
+            whens.append(0)
+        elif token == "WHEN":
+            whens[-1] += 1
+            most = max(most, sum(whens))
+        else:
+            whens.pop()
+    return most
+
+
+@pytest.mark.parametrize("rows", [4_000, 40_000])
+def test_comp_rows_work(rows: int) -> None:
+    """Bisection work grows with the changed keys, not with the rows of the tables."""
+    changed, factor = 3, 8
+    with _get_duckdb() as con:
+        con.execute(f"CREATE TABLE rows1 AS SELECT i AS id, i % 7 AS v FROM range({rows}) t(i)")
+        con.execute("CREATE TABLE rows2 AS SELECT * FROM rows1")
+        con.execute(f"UPDATE rows2 SET v = -1 WHERE id % {rows // changed} = 5")
+        comp = SQLComparator("rows1", "rows2", con=con, con_type="DUCKDB")
+        comp.bisection_factor, comp.bisection_threshold = factor, 1
+        comp.tracer = Tracer()
+        comp.comp_rows(keys=("id",))
+
+    result = cast("RowDiffResults", comp.results[0])
+    assert len(result.updated) == changed
+    assert result.rows_fetched == 2 * changed
+    spans = [span for root in comp.tracer.spans for span in root.walk()]
+    ## Each mismatching range is split at up to `factor` keys:
+    segments = changed * (factor + 1)
+    assert max(span.attrs["segments"] for span in spans if span.name == "checksum") <= segments
+    ## Rows are looked up among the key ranges by bisection, not by trying every range:
+    most = max(_comparisons_per_row(span.attrs["sql"]) for span in spans if span.name == "sql")
+    assert most <= math.ceil(math.log2(segments)) + 1
+
+
+def test_freq_cache_eviction() -> None:
+    """The cache is bounded in bytes and evicts the least recently used comparison."""
+    cols = DataFrameComparator.comp_freq_analysis_cols
+    data = pl.DataFrame({"a": ["x"], "b": ["y"]} | {col: [1] for col in cols})
+    size = nw.from_native(data).estimated_size("b")
+
+    cache = FreqCache(max_bytes=int(2 * size))
+    cache.put(("a", "b"), data)
+    cache.put(("a",), data.drop("b"))
+    assert cache.rollup(("b",), cols) is not None  # ("a", "b") is now most recently used
+
+    cache.put(("b",), data.drop("a"))
+    assert len(cache) == 2
+    assert ("a",) not in cache, "The least recently used comparison must be evicted"
+    assert cache.nbytes <= cache.max_bytes
+
+    cache.put(("c",), pl.concat([data] * 3))
+    assert ("c",) not in cache, "Comparisons larger than the bound are never cached"
+
+
+@pytest.mark.parametrize("vars", [("state",), ("channel",), ("state", "channel")])
+def test_dataframe_strategies(vars: tuple[str, ...]) -> None:
+    """The tagged single group by must match the emulated full join of both aggregates."""
+    results = []
+    for strategy in ("tagged", "join"):
+        comp = DataFrameComparator(pl.DataFrame(_TABLE1), pl.DataFrame(_TABLE2), strategy=strategy)
+        comp.comp_freq(vars)
+        results.append(_to_polars(cast("FreqResults[Any]", comp.results[0]).data, vars))
+
+    tagged, joined = results
+    assert tagged.equals(joined.select(tagged.columns))
+
+    ## Typed as Any, since the strategy is invalid on purpose:
+    invalid: Any = "hash"
+    with pytest.raises(ValueError, match="strategy"):
+        DataFrameComparator(pl.DataFrame(_TABLE1), pl.DataFrame(_TABLE2), strategy=invalid)
+
+
+@pytest.mark.parametrize("native", [pl.DataFrame, pd.DataFrame])
+@pytest.mark.parametrize("strategy", ["tagged", "join"])
+@pytest.mark.parametrize(
+    ("vars", "offset"),
+    [
+        (("city", "state"), 0),  # keys repeat, chunks are counted before routing
+        (("city",), 0),  # null keys in both dataframes
+        (("id",), 50),  # keys are unique per chunk, rows are routed as they are
+        (("mixed",), 50),  # null keys in the first chunks, then unique keys routed as rows
+    ],
+)
+def test_parallel_counting(
+    native: Callable[[dict[str, list[Any]]], Any],
+    strategy: DATAFRAME_STRATEGIES,
+    vars: tuple[str, ...],
+    offset: int,
+) -> None:
+    """Counting on a process pool must match counting in process, every key counted once."""
+    df1, df2 = (
+        native(
+            pl.concat([pl.DataFrame(table)] * 20)
+            .with_row_index("id", offset=i * offset)
+            .with_columns(
+                mixed=pl.when(pl.col("id") >= 60 + i * offset).then(pl.col("id").cast(pl.String))
+            )
+            .cast({"id": pl.String})
+            .to_dict(as_series=False)
+        )
+        for i, table in enumerate((_TABLE1, _TABLE2))
+    )
+    results = []
+    for max_workers in (1, 3):
+        comp = DataFrameComparator(df1, df2, strategy=strategy, max_workers=max_workers)
+        comp.comp_freq(vars)
+        results.append(_to_polars(cast("FreqResults[Any]", comp.results[0]).data, vars))
+
+    serial, parallel = results
+    ## Null keys of both dataframes stay apart where joins of the backend do not match them:
+    assert not parallel.select(vars).drop_nulls().is_duplicated().any()
+    assert_frame_equal(parallel, serial.select(parallel.columns))
+
+    assert _pool_context("polars", preload=False).get_start_method() == "spawn"
+
+    with pytest.raises(ValueError, match="max_workers"):
+        DataFrameComparator(df1, df2, max_workers=0)
+    with pytest.raises(NotImplementedError, match="eager"):
+        DataFrameComparator(pl.DataFrame(_TABLE1).lazy(), df2, max_workers=2)
+
+
+def test_stable_hashes_strings() -> None:
+    """Strings sharing their length, leading and trailing bytes spread over partitions."""
+    keys = pa.table({"key": [f"customer-{i:06d}-region-eu-west" for i in range(1000)]})
+    hashes = stable_hashes(keys)
+    assert len(set(hashes.to_pylist())) == keys.num_rows
+    partitions = pc.value_counts(pc.bit_wise_and(hashes, pa.scalar(7, pa.uint64())))
+    assert len(partitions) == 8
+    assert max(partitions.field("counts").to_pylist()) < keys.num_rows / 4
+
+    restacked = pa.table({"key": pa.array(keys["key"].to_pylist(), pa.large_binary())})
+    assert stable_hashes(restacked).equals(hashes), "Strings must hash as their bytes"
+
+
+def _key_encoding_reference(vars: tuple[str, ...]) -> pl.DataFrame:
+    """Counts of the test tables by the key columns, with a boolean `is_austin` column.
+
+    Null keys match across tables as they do when encoded, stacked and grouped.
+    """
+    frame1, frame2 = (
+        pl.DataFrame(table).with_columns(is_austin=pl.col("city") == "Austin")
+        for table in (_TABLE1, _TABLE2)
+    )
+    comp = DataFrameComparator(frame1, frame2, strategy="tagged")
+    comp.comp_freq(vars)
+    return _to_polars(cast("FreqResults[Any]", comp.results[0]).data, vars)
+
+
+@pytest.mark.parametrize("arg", [arg for arg in args if arg.con_type != "NARWHALS"])
+@pytest.mark.parametrize("strategy", ["pushdown", "materialize"])
+@pytest.mark.parametrize(
+    "vars", [("city", "state"), ("city", "channel"), ("state",), ("is_austin", "state")]
+)
+def test_sql_key_encoding(arg: _Args, strategy: SQL_STRATEGIES, vars: tuple[str, ...]) -> None:
+    """Hash encoded keys must decode to the counts of grouping by the key columns.
+
+    Every type of key column must decode, i.e. booleans, which have no `MIN` in Postgres.
+    """
+    with arg.yielder() as con:
+        _load_tables(con, {"strings1": _TABLE1, "strings2": _TABLE2})
+        for i in (1, 2):
+            con.execute(
+                f"CREATE TABLE table{i} AS SELECT *, city = 'Austin' AS is_austin FROM strings{i}"
+            )
+        comp = SQLComparator(
+            "table1",
+            "table2",
+            con,
+            cast("SQL_CONNECTIONS", arg.con_type),
+            strategy=strategy,
+            key_encoding="hash",
+        )
+        comp.comp_freq(vars)
+
+    expected = _key_encoding_reference(vars)
+    encoded = _to_polars(cast("FreqResults[Any]", comp.results[0]).data, vars)
+    assert_frame_equal(encoded.select(expected.columns), expected, check_dtypes=False)
+
+
+@pytest.mark.parametrize(
+    ("native", "strategy"),
+    [
+        (pl.DataFrame, "tagged"),
+        (pl.DataFrame, "join"),
+        (pl.LazyFrame, "tagged"),
+        (pd.DataFrame, "tagged"),
+        (pd.DataFrame, "join"),
+    ],
+)
+@pytest.mark.parametrize("vars", [("city", "state"), ("city", "channel"), ("state",)])
+def test_key_encoding(
+    native: Callable[[dict[str, list[str | None]]], Any],
+    strategy: DATAFRAME_STRATEGIES,
+    vars: tuple[str, ...],
+) -> None:
+    """Hash encoded keys must decode to the counts of grouping by the key columns.
+
+    Null keys match across tables when encoded, as they do when stacked and grouped.
+    """
+    comp = DataFrameComparator(
+        native(_TABLE1), native(_TABLE2), strategy=strategy, key_encoding="hash"
+    )
+    comp.comp_freq(vars)
+    comp.collect()
+
+    expected = _key_encoding_reference(vars)
+    encoded = _to_polars(cast("FreqResults[Any]", comp.results[0]).data, vars)
+    assert_frame_equal(encoded.select(expected.columns), expected, check_dtypes=False)
+
+    ## Typed as Any, since the encoding is invalid on purpose:
+    invalid: Any = "id"
+    with pytest.raises(ValueError, match="key_encoding"):
+        DataFrameComparator(pl.DataFrame(_TABLE1), pl.DataFrame(_TABLE2), key_encoding=invalid)
+    with pytest.raises(NotImplementedError, match="polars and pandas"):
+        DataFrameComparator(pa.table(_TABLE1), pa.table(_TABLE2), key_encoding="hash")
+
+
+def _duckdb_relation(table: dict[str, list[str | None]]) -> Any:
+    frame = pl.DataFrame(table)  # noqa: F841 - scanned by duckdb below
+    return duckdb.sql("SELECT * FROM frame")
+
+
+@pytest.mark.parametrize("lazify", [pl.LazyFrame, _duckdb_relation])
+def test_lazy_comparisons(lazify: Callable[[dict[str, list[str | None]]], Any]) -> None:
+    """Lazy inputs are recorded as plans and executed together on collect."""
+    eager = DataFrameComparator(pl.DataFrame(_TABLE1), pl.DataFrame(_TABLE2))
+    lazy = DataFrameComparator(lazify(_TABLE1), lazify(_TABLE2))
+    for comp in (eager, lazy):
+        comp.comp_freq(("city", "state"))
+        comp.comp_freq_many([("state",), ("channel",)])
+
+    results = cast("list[FreqResults[Any]]", lazy.results)
+    assert all(result.is_lazy for result in results), "Comparisons must be deferred"
+
+    lazy.collect()
+    assert not any(result.is_lazy for result in results), "Comparisons must be collected"
+    assert len(lazy.freq_cache) == len(results), "Collected comparisons must be cached"
+
+    for result, expected in zip(
+        results, cast("list[FreqResults[Any]]", eager.results), strict=True
+    ):
+        vars = list(result.vars)
+        cols = [*vars, *lazy.comp_freq_analysis_cols]
+        assert (
+            _to_polars(result.data, vars)
+            .select(cols)
+            .equals(_to_polars(expected.data, vars).select(cols))
+        )
+
+    lazy.compile_report()
+
+
+@pytest.mark.parametrize("native", [pl.DataFrame, pl.LazyFrame, pa.table, _duckdb_relation])
+def test_top_rows(native: Callable[[dict[str, Any]], Any]) -> None:
+    """Native top-k, and limits pushed into lazy plans, must agree with a full sort."""
+    frame = nw.from_native(native({"key": list("abcde"), "drift": [0.3, 0.9, 0.1, 0.7, 0.5]}))
+    top = top_rows(frame, sort_by="drift", descending=True, top_n=3)
+    bottom = top_rows(frame, sort_by="drift", descending=False, top_n=3)
+    assert top["key"].to_list() == ["b", "d", "e"]
+    assert bottom["key"].to_list() == ["c", "a", "e"]
+    assert len(top_rows(frame, sort_by=None, descending=True, top_n=2)) == 2
+    assert [len(page) for page in pages(top, page_size=2)] == [2, 1]
+    with pytest.raises(ValueError, match="top_n"):
+        top_rows(frame, sort_by="drift", descending=True, top_n=0)
+
+
+def test_report_modes(capsys: pytest.CaptureFixture[str]) -> None:
+    """Top-N and summary reports leave lazy results uncollected, pages split the tables."""
+    comp = DataFrameComparator(pl.LazyFrame(_TABLE1), pl.LazyFrame(_TABLE2))
+    comp.comp_freq(("city", "state"))
+    result = cast("FreqResults[Any]", comp.results[0])
+
+    comp.compile_report(top_n=2)
+    comp.compile_report(summary_only=True)
+    assert result.is_lazy
+    assert "Drifting Keys" in capsys.readouterr().out
+
+    comp.compile_report(page_size=1)
+    assert not result.is_lazy
+    rows = len(nw.from_native(result.data))
+    assert capsys.readouterr().out.count("Dimensions:") == rows
+
+
+@pytest.mark.parametrize("suffix", [".arrow", ".feather", ".parquet"])
+def test_result_set(suffix: str, tmp_path: Path) -> None:
+    """Results of any engine must stack, export and read back unchanged, IPC without copies."""
+    with _get_duckdb() as con:
+        comp = _create_comparator(
+            _Args(con_type="DUCKDB", comparator=SQLComparator), con, _TABLE1, _TABLE2
+        )
+        comp.comp_freq_many([("state",), ("city", "channel")])
+        comp.comp_freq(("state",), sample=1.0)
+    frames = DataFrameComparator(pl.DataFrame(_TABLE1), pl.DataFrame(_TABLE2))
+    frames.comp_freq(("channel",))
+    frames.comp_freq_sketch(("channel",))
+    results = [*comp.results, frames.results[0]]
+
+    result_set = ResultSet(results)
+    assert result_set.table.column_names[:4] == ["dimensions", "state", "city", "channel"]
+    ## Sampled counts are floats, promoting all counts, exact counts alone are not copied:
+    exact = ResultSet(results[:2]).table["n1"].chunks[0]
+    arrow_data = cast("FreqResults[Any]", results[0]).data
+    exact_buffer = exact.buffers()[1]
+    assert exact_buffer is not None
+    assert exact_buffer.address == arrow_data["n1"].chunk(0).buffers()[1].address
+
+    path = tmp_path / f"results{suffix}"
+    result_set.write(path)
+    allocated = pa.total_allocated_bytes()
+    loaded = ResultSet.read(path)
+    if suffix != ".parquet":
+        assert pa.total_allocated_bytes() == allocated, "IPC must be memory mapped"
+
+    assert loaded.table["dimensions"].to_pylist() == result_set.table["dimensions"].to_pylist()
+    for original, read in zip(results, loaded.results, strict=True):
+        vars = list(cast("FreqResults[Any]", original).vars)
+        assert read.vars == tuple(vars)
+        assert_frame_equal(
+            _to_polars(read.data, vars),
+            _to_polars(cast("FreqResults[Any]", original).data, vars),
+            check_dtypes=False,
+        )
+
+    with pytest.raises(TypeError, match="SketchResults"):
+        ResultSet(frames.results)
+    with pytest.raises(ValueError, match="format"):
+        result_set.write(tmp_path / "results.csv")
+
+
+def _parquet_dataset(table: dict[str, list[str | None]], path: Path) -> Any:
+    """Write `table` as a directory of two parquet files, and open it as a dataset."""
+    frame = pl.DataFrame(table)
+    path.mkdir()
+    frame.head(2).write_parquet(path / "part-0.parquet")
+    frame.tail(-2).write_parquet(path / "part-1.parquet")
+    return ds.dataset(path)
+
+
+def _batch_reader(table: dict[str, list[str | None]], path: Path) -> Any:
+    """Stream `table` one row per batch, as a reader."""
+    return pl.DataFrame(table).to_arrow().to_reader(max_chunksize=1)
+
+
+@pytest.mark.parametrize("source", [_parquet_dataset, _batch_reader])
+def test_arrow_comparator(source: Callable[[Any, Path], Any], tmp_path: Path) -> None:
+    """Streamed sources must compare equal to their materialized dataframes."""
+    vars_many = [("city", "state"), ("state",), ("channel",)]
+    expected = DataFrameComparator(pl.DataFrame(_TABLE1), pl.DataFrame(_TABLE2))
+    expected.comp_freq_many(vars_many)
+
+    comp = ArrowComparator(source(_TABLE1, tmp_path / "a"), source(_TABLE2, tmp_path / "b"))
+    comp.stream_merge_rows = 2  # merge the running aggregate many times
+    comp.comp_freq_many(vars_many)
+    comp.comp_freq(("state",))
+
+    results = cast("list[FreqResults[Any]]", comp.results)
+    for result, exact in zip(results, [*expected.results, expected.results[1]], strict=True):
+        vars = list(result.vars)
+        data = _to_polars(result.data, vars).select(*vars, *comp.comp_freq_analysis_cols)
+        assert_frame_equal(data, _to_polars(cast("FreqResults[Any]", exact).data, vars))
+
+    if source is _batch_reader:
+        with pytest.raises(ValueError, match="only be scanned once"):
+            comp.comp_freq(("city", "channel"))
+    comp.compile_report()
+
+    columns = ArrowComparator(source(_TABLE1, tmp_path / "c"), source(_TABLE2, tmp_path / "d"))
+    columns.comp_freq_all_columns()  # readers count every column in their single scan
+    expected.comp_freq_all_columns()
+    for column, exact in zip(
+        cast("list[FreqResults[Any]]", columns.results),
+        expected.results[-len(_TABLE1) :],
+        strict=True,
+    ):
+        vars = list(column.vars)
+        data = _to_polars(column.data, vars)
+        assert_frame_equal(data, _to_polars(cast("FreqResults[Any]", exact).data, vars))
+
+
+def test_sql_scheduler() -> None:
+    """Concurrent jobs must match serial comparisons, returned in job order."""
+    jobs = [
+        ("table1", "table2", ("state",)),
+        ("table2", "table1", ("city", "state")),
+        ("table1", "table2", ("channel",)),
+        ("table1", "table1", ("state",)),
+        ("table1", "table2", ("state",)),
+    ]
+    with _get_duckdb() as con:
+        _create_comparator(
+            _Args(con_type="DUCKDB", comparator=SQLComparator), con, _TABLE1, _TABLE2
+        )
+        results = SQLScheduler(con, "DUCKDB", max_concurrency=2).run(jobs)
+
+        assert [tuple(result.vars) for result in results] == [vars for *_, vars in jobs]
+        for (df1, df2, vars), result in zip(jobs, results, strict=True):
+            serial = SQLComparator(df1, df2, con=con, con_type="DUCKDB")
+            serial.comp_freq(vars)
+            expected = _to_polars(cast("FreqResults[Any]", serial.results[0]).data, vars)
+            assert _to_polars(result.data, vars).equals(expected)
+
+    with pytest.raises(ValueError, match="max_concurrency"):
+        SQLScheduler(None, "DUCKDB", max_concurrency=0)
+    with pytest.raises(ValueError, match="connect"):
+        SQLScheduler(None, "PSYCOPG2")
+
+
+def test_sql_scheduler_profiles(tmp_path: Path) -> None:
+    """Scheduled pairs store the profiles of their first table, reused by later runs."""
+    jobs = [("table1", "table2", ("state",)), ("table1", "table2", ("city", "state"))]
+    store = ProfileStore(tmp_path)
+    with _get_duckdb() as con:
+        _load_tables(con, {"table1": _TABLE1, "table2": _TABLE2})
+        tracer = Tracer()
+        runs = [
+            SQLScheduler(con, "DUCKDB", profile_store=store, tracer=tracer).run(jobs)
+            for _ in range(2)
+        ]
+
+    assert len(store) == 2, "Every scheduled dimension set must be profiled"
+    hits = [
+        span.attrs["hit"] for root in tracer.spans for span in root.walk() if span.name == "profile"
+    ]
+    assert hits == [False, False, True, True]
+    for stored, reused in zip(*runs, strict=True):
+        vars = list(stored.vars)
+        assert_frame_equal(_to_polars(reused.data, vars), _to_polars(stored.data, vars))
+
+
+@pytest.mark.parametrize("strategy", ["materialize", "isolated"])
+def test_interim_tables_cleanup(strategy: SQL_STRATEGIES) -> None:
+    """Interim tables never outlive a comparison, even a failing one."""
+    with _get_duckdb() as con:
+        _create_comparator(
+            _Args(con_type="DUCKDB", comparator=SQLComparator), con, _TABLE1, _TABLE2
+        )
+        jobs = [("table1", "table2", ("state",)), ("table2", "table1", ("channel",))]
+        SQLScheduler(con, "DUCKDB", max_concurrency=2, strategy=strategy).run(jobs)
+
+        comp = SQLComparator("table1", "table2", con=con, con_type="DUCKDB", strategy=strategy)
+        with pytest.raises(duckdb.BinderException):
+            comp.comp_freq(("missing",))
+        comp.comp_freq(("state",))
+
+        tables = con.sql("SELECT table_name FROM duckdb_tables()").fetchall()
+        assert sorted(tables) == [("table1",), ("table2",)]
+
+
+@pytest.mark.parametrize("strategy", ["pushdown", "materialize"])
+def test_tracing(strategy: SQL_STRATEGIES, capsys: pytest.CaptureFixture[str]) -> None:
+    """Traced operations record their stages and SQL, untraced ones record nothing."""
+    ended: list[Span] = []
+    tracer = Tracer(callbacks=[ended.append])
+    with _get_duckdb() as con:
+        comp = _create_comparator(
+            _Args(con_type="DUCKDB", comparator=SQLComparator, strategy=strategy),
+            con,
+            _TABLE1,
+            _TABLE2,
+        )
+        comp.comp_freq(("state",))
+        assert comp.results[0].trace is None
+
+        comp.tracer = tracer
+        comp.comp_freq(("city", "state"))
+        comp.comp_freq(("city",))
+        comp.compile_report()
+
+    freq, rolled_up, report = tracer.spans
+    assert [span.name for span in tracer.spans] == ["comp_freq", "comp_freq", "compile_report"]
+    assert ended[-1] is report
+    assert comp.results[1].trace is freq
+    assert comp.results[2].trace is rolled_up
+    assert [child.name for child in report.children] == ["collect", "render"]
+
+    stages = freq.summary()
+    expected = {"pushdown"} if strategy == "pushdown" else {"aggregate", "join", "diff"}
+    assert expected <= set(stages)
+    assert stages["sql"]["rows"] == len(cast("FreqResults[Any]", comp.results[1]).data)
+    statements = [span.attrs["sql"] for span in freq.walk() if span.name == "sql"]
+    assert any("GROUP BY" in statement for statement in statements)
+    if strategy == "materialize":
+        assert (statements[0], statements[-1]) == ("BEGIN TRANSACTION", "ROLLBACK")
+    assert all(span.peak_rss is None or span.peak_rss > 0 for span in freq.walk())
+    assert "sql" not in rolled_up.summary()
+    assert rolled_up.children[0].attrs["hit"]
+    assert "Dimensions" in capsys.readouterr().out
+
+
+## Seconds `import drift_scope` may take, it took 0.65s importing every dependency eagerly:
+_IMPORT_BUDGET = 0.15
+
+_IMPORT_CHECK = """
+import json, sys, time
+heavy = ("narwhals", "pyarrow", "pyarrow.compute", "pyarrow.dataset", "rich", "polars", "pandas")
+start = time.perf_counter()
+import drift_scope
+seconds = time.perf_counter() - start
+loaded = {"drift_scope": [module for module in heavy if module in sys.modules]}
+from drift_scope import DataFrameComparator
+loaded["DataFrameComparator"] = [module for module in heavy if module in sys.modules]
+from drift_scope import SQLComparator
+loaded["SQLComparator"] = [module for module in heavy if module in sys.modules]
+print(json.dumps({"seconds": seconds, "loaded": loaded}))
+"""
+
+
+def test_import_time() -> None:
+    """Importing the package loads no dependency, comparators only those of their path."""
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_CHECK], capture_output=True, text=True, check=True
+    ).stdout
+    report = json.loads(out)
+    assert report["loaded"] == {
+        "drift_scope": [],
+        "DataFrameComparator": ["narwhals"],
+        "SQLComparator": ["narwhals", "pyarrow"],
+    }
+    assert report["seconds"] < _IMPORT_BUDGET
+
+
 if __name__ == "__main__":
     for param in expanded_args:
         test_manual1(param)